@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks of majority judgment polling, on synthetic polls.
+
+Usage:
+
+    ./bench_limaju.py --judges 1e3,1e4,1e5 --candidates 5,50 > bench.jsonl
+
+Each line of output is a JSON object with the parameters of the poll,
+the phase timed and its duration in seconds (the best of `--repeat`).
+Polls are written in a temporary file, and read back from it in each phase.
+
+Run `./bench_limaju.py --help` for more options.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import os
+from collections import deque
+
+from limaju import \
+    __version__, load_judgments_from_file, \
+    deliberate, sort_candidates, plot_merit_profile
+
+PHASES = [
+    'load_judgments_from_file',
+    'deliberate',
+    'sort_candidates',
+    'plot_merit_profile',
+]
+
+
+def generate_mentions(mentions_amount):
+    return ["MENTION %d" % i for i in range(mentions_amount)]
+
+
+def generate_judgments(judges_amount,
+                       candidates_amount,
+                       mentions,
+                       blank_rate=0.0,
+                       tie_density=0.0,
+                       seed=0,
+                       chunk_size=10000):
+    """
+    Generate a synthetic poll, as CSV.  The same seed gives the same poll.
+
+    Each candidate has a quality, around which its judges tend to judge it.
+    With a probability of `tie_density`, a candidate gets the very same
+    judgments as an earlier candidate, and both end up in an exact tie.
+
+    :param mentions: List, highest to lowest
+    :param blank_rate: Probability of a judgment to be left blank
+    :param tie_density: Probability of a candidate to copy an earlier one
+    :param chunk_size: Amount of rows per chunk
+    :return: Generator of Strings, chunks of rows, the candidates first
+    """
+    rng = random.Random(seed)
+    worst = len(mentions) - 1
+    candidates = ["Candidate %d" % i for i in range(candidates_amount)]
+
+    # Each column is either judged around a quality, or a copy of another.
+    qualities = []
+    copies = []
+    for i in range(candidates_amount):
+        if i and rng.random() < tie_density:
+            qualities.append(None)
+            copies.append(rng.randrange(i))
+        else:
+            qualities.append(rng.random() * worst)
+            copies.append(None)
+
+    yield ",".join(candidates) + "\n"
+
+    for start in range(0, judges_amount, chunk_size):
+        lines = []
+        for _ in range(min(chunk_size, judges_amount - start)):
+            judgments = []
+            for quality, copy in zip(qualities, copies):
+                if copy is not None:
+                    judgments.append(judgments[copy])
+                elif rng.random() < blank_rate:
+                    judgments.append('')
+                else:
+                    judgments.append(mentions[min(worst, max(0, int(round(
+                        rng.gauss(quality, worst / 3.0)
+                    ))))])
+            lines.append(",".join(judgments) + "\n")
+        yield "".join(lines)
+
+
+def write_judgments(filename, *args, **kwargs):
+    """
+    Write a synthetic poll in a file, chunk by chunk, so that it never has
+    to fit in memory.  See `generate_judgments` for the parameters.
+    """
+    with open(filename, 'w') as judgments_file:
+        for chunk in generate_judgments(*args, **kwargs):
+            judgments_file.write(chunk)
+
+
+def time_phase(function, repeat):
+    """
+    :return: Tuple (Float, the best duration in seconds, result of a run)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best, result
+
+
+def bench_poll(judges_amount, candidates_amount, mentions_amount,
+               blank_rate=0.0, tie_density=0.0, seed=0,
+               repeat=3, phases=None):
+    """
+    Time each phase of a deliberation, separately, on a synthetic poll.
+
+    :return: List of Dicts, one per phase
+    """
+    phases = PHASES if phases is None else phases
+    mentions = generate_mentions(mentions_amount)
+    descriptor, judgments_filename = tempfile.mkstemp(suffix='.csv')
+    os.close(descriptor)
+    try:
+        write_judgments(
+            judgments_filename, judges_amount, candidates_amount, mentions,
+            blank_rate, tie_density, seed
+        )
+
+        def load():
+            with open(judgments_filename) as judgments_file:
+                # Streamed, without keeping the rows.
+                deque(load_judgments_from_file(judgments_file), maxlen=0)
+
+        def deliberate_file():
+            with open(judgments_filename) as judgments_file:
+                return deliberate(judgments_file, mentions)
+
+        durations = dict()
+        durations['load_judgments_from_file'], _ = time_phase(load, repeat)
+        durations['deliberate'], (deliberation, tallies) = time_phase(
+            deliberate_file, repeat
+        )
+    finally:
+        os.unlink(judgments_filename)
+
+    durations['sort_candidates'], _ = time_phase(
+        lambda: sort_candidates(tallies, list(tallies), mentions), repeat
+    )
+    if 'plot_merit_profile' in phases:
+        descriptor, filename = tempfile.mkstemp(suffix='.png')
+        os.close(descriptor)
+        try:
+            durations['plot_merit_profile'], _ = time_phase(
+                lambda: plot_merit_profile(
+                    tallies, deliberation, mentions, filename=filename
+                ),
+                repeat
+            )
+        finally:
+            os.unlink(filename)
+
+    return [
+        {
+            'version': __version__,
+            'python': platform.python_version(),
+            'phase': phase,
+            'seconds': durations[phase],
+            'judges': judges_amount,
+            'candidates': candidates_amount,
+            'mentions': mentions_amount,
+            'blank_rate': blank_rate,
+            'tie_density': tie_density,
+            'seed': seed,
+        }
+        for phase in phases
+    ]
+
+
+def parse_amounts(amounts):
+    return [int(float(amount)) for amount in amounts.split(',') if amount]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--judges",
+        default="1e3,1e4,1e5",
+        type=parse_amounts,
+        help="Amounts of judges to sweep, comma-separated."
+    )
+
+    parser.add_argument(
+        "--candidates",
+        default="5,50,500",
+        type=parse_amounts,
+        help="Amounts of candidates to sweep, comma-separated."
+    )
+
+    parser.add_argument(
+        "--mentions",
+        default="7",
+        type=parse_amounts,
+        help="Amounts of mentions to sweep, comma-separated."
+    )
+
+    parser.add_argument(
+        "--blank-rate",
+        default=0.05,
+        type=float,
+        dest="blank_rate",
+        help="Probability of a judgment to be left blank."
+    )
+
+    parser.add_argument(
+        "--tie-density",
+        default=0.1,
+        type=float,
+        dest="tie_density",
+        help="Probability of a candidate to tie with an earlier one."
+    )
+
+    parser.add_argument(
+        "--max-judgments",
+        default=1e8,
+        type=float,
+        dest="max_judgments",
+        help="Skip the polls with more judges × candidates than this."
+    )
+
+    parser.add_argument(
+        "--seed",
+        default=0,
+        type=int,
+        help="Seed of the synthetic polls."
+    )
+
+    parser.add_argument(
+        "--repeat",
+        default=3,
+        type=int,
+        help="Runs of each phase, the best one is kept."
+    )
+
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        default=False,
+        dest="no_plot",
+        help="Do not time plot_merit_profile."
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=argparse.FileType('w'),
+        default=sys.stdout,
+        help="Where to write the results, as JSON lines."
+    )
+
+    args = parser.parse_args()
+
+    if not args.no_plot:
+        import matplotlib
+        matplotlib.use('Agg')
+
+    phases = [p for p in PHASES if not (args.no_plot and 'plot' in p)]
+    for mentions_amount in args.mentions:
+        for candidates_amount in args.candidates:
+            for judges_amount in args.judges:
+                if judges_amount * candidates_amount > args.max_judgments:
+                    continue
+                for result in bench_poll(
+                        judges_amount, candidates_amount, mentions_amount,
+                        args.blank_rate, args.tie_density, args.seed,
+                        args.repeat, phases):
+                    args.output.write(json.dumps(result) + "\n")
+                    args.output.flush()
@@ -31,16 +31,30 @@ __author__ = "Constituantes"
 __version__ = "0.1.0"
 __license__ = "MIT"
 
+import os
 import sys
 import argparse
+import bisect
 import csv
+import glob
 import math
+import re
 import copy
-import numpy as np
-import matplotlib.pyplot as plt
-from pprint import pprint
-from io import StringIO
-from functools import cmp_to_key
+import json
+import hashlib
+import heapq
+import importlib
+import shutil
+import struct
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO, StringIO, TextIOWrapper
+from array import array
+from itertools import chain, repeat
+from collections import namedtuple, OrderedDict
+from xml.sax.saxutils import escape
+from contextlib import contextmanager, redirect_stdout
 
 PY2 = sys.version_info.major == 2
 
@@ -49,6 +63,93 @@ VERBOSITY_SOME = 1
 VERBOSITY_MUCH = 2
 VERBOSITY_VERY = 3
 
+# Amount of judgments counted at once, bounds the memory used while tallying.
+TALLY_CHUNK_SIZE = 1 << 16
+
+# In liquid polls, `@name` delegates a judgment to the judge `name`.
+DELEGATION_PREFIX = '@'
+DELEGATED = -1
+
+# In decreasing order.
+DEFAULT_MENTIONS = [
+    'EXCELLENT',
+    'VERY GOOD',
+    'GOOD',
+    'SOMEWHAT GOOD',
+    'PASSABLE',
+    'POOR',
+    'REJECT',
+]
+
+# What to do with an unknown mention, see `Validation`.
+UNKNOWN_MENTION_POLICIES = ('fail', 'blank', 'skip')
+MAX_REPORTED_ERRORS = 100
+JudgmentError = namedtuple('JudgmentError', ['row', 'column', 'mention'])
+
+# Timestamps of the judges, see `parse_timestamp`.  Google Forms first.
+TIMESTAMP_FORMATS = (
+    '%m/%d/%Y %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d',
+)
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+# Algorithms ranking the candidates, see `ALGORITHMS`.
+DEFAULT_ALGORITHM = 'majority-judgment'
+
+# Binary stores of judgments, see `convert_judgments_to_store`.
+STORE_MAGIC = b'LIMAJU\x00\x01'  # the last byte is the version
+STORE_MAX_MENTIONS = 256
+JudgmentsStore = namedtuple(
+    'JudgmentsStore',
+    ['filename', 'candidates', 'mentions', 'judges', 'offset']
+)
+
+# Fields of CSV rows, read like `csv.reader` does, see `ends_in_quotes`.
+# A quote only opens a field at its start, past the spaces; elsewhere, or
+# after the closing quote, it is a mere character of the field.
+CSV_QUOTED_REST = re.compile(rb'()(?:[^"]|"")*(")?[^,\n]*')
+CSV_FIELD = re.compile(rb' *(?:(")(?:[^"]|"")*(")?[^,\n]*|[^,\n]*)')
+
+# Compressions of judgments files, by their magic bytes, see
+# `decompress_judgments_file`: magic => module of the standard library.
+COMPRESSIONS = OrderedDict([
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'lzma'),
+])
+
+# Tally files, see `save_tally_file`.
+TALLY_FILE_FORMAT = 'limaju-tally'
+TALLY_FILE_VERSION = 1
+
+# Checkpoints of long tallies, see `tally_judgments_with_checkpoints`.
+CHECKPOINT_FILE_FORMAT = 'limaju-checkpoint'
+CHECKPOINT_FILE_VERSION = 1
+CHECKPOINT_INTERVAL = 60  # seconds
+CHECKPOINT_ANCHOR_SIZE = 4096  # bytes before the offset, hashed
+
+# Cached tallies, see `get_tally_cache_key`.
+TALLY_CACHE_SUFFIX = '.tally.json'
+TALLY_CACHE_SIZE = 64 * 1024 * 1024  # bytes
+
+# Amount of counts drawn at once by `bootstrap_ranks`, bounds its memory.
+BOOTSTRAP_BATCH_SIZE = 1 << 22
+
+# Colors of the mentions in merit profiles, highest to lowest.
+MERIT_PROFILE_COLORS = (
+    (0, 0.49, 0.24, 1),
+    (0.01, 0.67, 0.35, 1),
+    (0.49, 0.76, 0.22, 1),
+    (0.78, 0.84, 0, 1),
+    (0.99, 0.7, 0, 1),
+    (0.93, 0.43, 0, 1),
+    (0.88, 0.21, 0.11, 1),
+)
+MERIT_PROFILE_DPI = 100
+MERIT_PROFILE_SYMBOLS = "#=+o:-."  # in plain text, highest to lowest
+
 
 def log(message):
     print(message)
@@ -69,6 +170,222 @@ def is_string(that_thing):
         isinstance(that_thing, bytes)
 
 
+def is_file(that_thing):
+    return hasattr(that_thing, 'read')
+
+
+class Profile(object):
+    """
+    Wall time, CPU time and peak of traced memory of the phases of a run,
+    and counters of what was done.  Give one to `deliberate` as `profile`.
+
+    Phases may nest, the time of a phase excluding the time of the phases
+    run within it.  Measure your own phases with `with profile.phase(name):`,
+    eg. around `plot_merit_profile`.  Tracing the memory slows everything
+    down, so it may be disabled.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.phases = OrderedDict()  # name => dict of measures
+        self.counters = OrderedDict()  # name => int
+        self.running = []  # stack of the phases being measured
+        self.tracing = trace_memory and not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+
+    def close(self):
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def start(self, name):
+        if tracemalloc.is_tracing():
+            if self.running:  # the peak of the outer phase, so far
+                self.running[-1][5] = max(
+                    self.running[-1][5], tracemalloc.get_traced_memory()[1]
+                )
+            # Before Python 3.9, peaks of phases include the earlier ones.
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        self.running.append(
+            [name, time.perf_counter(), time.process_time(), 0.0, 0.0, 0]
+        )
+
+    def stop(self):
+        name, wall, cpu, inner_wall, inner_cpu, peak_memory = \
+            self.running.pop()
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        if tracemalloc.is_tracing():
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        else:
+            peak_memory = None
+        if self.running:
+            self.running[-1][3] += wall
+            self.running[-1][4] += cpu
+            if peak_memory is not None:
+                self.running[-1][5] = max(self.running[-1][5], peak_memory)
+
+        measures = self.phases.setdefault(name, {
+            'wall': 0.0, 'cpu': 0.0, 'peak_memory': None,
+        })
+        measures['wall'] += wall - inner_wall
+        measures['cpu'] += cpu - inner_cpu
+        if peak_memory is not None:
+            measures['peak_memory'] = max(
+                peak_memory, measures['peak_memory'] or 0
+            )
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Measure what runs within the `with` block.
+        """
+        self.start(name)
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def iterate(self, name, iterable):
+        """
+        Measure the time spent producing the items of an iterable,
+        eg. parsing the rows of a file streamed through other phases.
+        """
+        iterator = iter(iterable)
+        while True:
+            self.start(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.stop()
+            yield item
+
+    def get_report(self):
+        return OrderedDict([
+            ('phases', [
+                dict(name=name, **measures)
+                for name, measures in self.phases.items()
+            ]),
+            ('counters', self.counters),
+        ])
+
+    def format(self, output_format='text'):
+        if output_format == 'json':
+            return json.dumps(self.get_report())
+
+        lines = ["%-16s %10s %10s %12s" % (
+            'PHASE', 'WALL (s)', 'CPU (s)', 'PEAK (MiB)'
+        )]
+        for name, measures in self.phases.items():
+            peak_memory = measures['peak_memory']
+            lines.append("%-16s %10.4f %10.4f %12s" % (
+                name, measures['wall'], measures['cpu'],
+                '-' if peak_memory is None else
+                "%.2f" % (peak_memory / (1024.0 * 1024.0))
+            ))
+        for name, amount in self.counters.items():
+            lines.append("%-16s %10d" % (name, amount))
+        return "\n".join(lines)
+
+
+class InvalidJudgmentsError(ValueError):
+    """
+    Raised when judgments hold unknown mentions, after reading them all.
+    """
+
+    def __init__(self, validation):
+        self.errors = list(validation.errors)
+        self.errors_amount = validation.errors_amount
+        first = self.errors[0]
+        super(InvalidJudgmentsError, self).__init__(
+            "Found %d unknown mention(s), the first one `%s' "
+            "at row %d, column %d." % (
+                self.errors_amount, first.mention, first.row, first.column
+            )
+        )
+
+
+class Validation(object):
+    """
+    What to do with the unknown mentions of judgments, and where they are.
+    Give one to `deliberate` as `validation`.
+
+    With the `fail` policy, all the judgments are read and then
+    an InvalidJudgmentsError is raised, reporting all the unknown mentions.
+    With `blank`, unknown mentions are counted as blank judgments,
+    and with `skip`, the rows holding them are not counted at all.
+    Only the first `max_errors` unknown mentions are kept.
+    """
+
+    def __init__(self, on_unknown_mention='fail',
+                 max_errors=MAX_REPORTED_ERRORS):
+        if on_unknown_mention not in UNKNOWN_MENTION_POLICIES:
+            raise ValueError("Unknown policy `%s', pick one of %s." % (
+                on_unknown_mention, ", ".join(UNKNOWN_MENTION_POLICIES)
+            ))
+        self.on_unknown_mention = on_unknown_mention
+        self.max_errors = max_errors
+        self.errors = []  # of JudgmentError, row and column from 1
+        self.errors_amount = 0
+        self.rows = 0  # of judges read
+
+    def add_error(self, row, column, mention):
+        self.errors_amount += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(JudgmentError(row, column, mention))
+
+    def merge(self, other):
+        """
+        Add the errors of the rows read by `other` after ours.
+        """
+        for error in other.errors:
+            if len(self.errors) < self.max_errors:
+                self.errors.append(error._replace(row=error.row + self.rows))
+        self.errors_amount += other.errors_amount
+        self.rows += other.rows
+
+    def check(self):
+        """
+        :raise InvalidJudgmentsError: With the `fail` policy, if need be
+        """
+        if self.errors_amount and self.on_unknown_mention == 'fail':
+            raise InvalidJudgmentsError(self)
+
+    def format_errors(self):
+        """
+        :return: String, one line per unknown mention kept
+        """
+        lines = [
+            "Unknown mention `%s' at row %d, column %d." % (
+                error.mention, error.row, error.column
+            )
+            for error in self.errors
+        ]
+        if self.errors_amount > len(self.errors):
+            lines.append("... and %d more." % (
+                self.errors_amount - len(self.errors)
+            ))
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile_phase(profile, name):
+    """
+    :return: Context manager measuring a phase, doing nothing without profile
+    """
+    if profile is None:
+        yield
+    else:
+        with profile.phase(name):
+            yield
+
+
 def get_positions(mentions):
     mentions_dict = dict()
     for i, mention in enumerate(mentions):
@@ -103,6 +420,80 @@ def get_median(tally, mentions):
     return median
 
 
+def get_majority_value_from_counts(counts):
+    """
+    Closed-form majority value of a merit profile, to use as a sort key.
+
+    The majority value is the sequence of medians we get by removing the
+    (low) median judgment again and again, like `sort_two_candidates` does.
+    The removed judgments spread out from the middle of the sorted judgments,
+    alternating between the low side and the high side.  They are paired two
+    by two from the first one, whatever the amount of judgments, so that the
+    pairs of two candidates line up, and the sequence of pairs is made of runs
+    of identical pairs, at most two per mention.
+
+    Each run is encoded with the direction of the next run, so that comparing
+    two keys as plain tuples orders the candidates like their majority values.
+    When the judgments of a candidate run out first, where the comparator
+    finds an exact equality, that candidate comes first.
+
+    :param counts: List, amount of judgments per mention, highest to lowest
+    :return: Tuple, the lower the better
+    """
+    worst = len(counts) - 1
+    ascending = list(reversed(counts))  # lowest to highest
+    total = sum(ascending)
+
+    if 0 == total:
+        # No judgments at all, ranked after any candidate with judgments.
+        return (((worst + 1,), 0, 0),)
+
+    ends = []  # exclusive end of each mention in the sorted judgments
+    current = 0
+    for count in ascending:
+        current += count
+        ends.append(current)
+
+    # Two judgments are removed at each step, one going up from the middle
+    # and one going down.  The first one removed is the lowest of the two,
+    # unless there is an odd amount of judgments, and the first one removed
+    # is the median itself.
+    up_first = bool(total % 2)
+    up, down = total // 2, total // 2 - 1
+    runs = []
+    while down >= 0:
+        high = bisect.bisect_right(ends, up)
+        low = bisect.bisect_right(ends, down)
+        length = min(ends[high] - up, down - (ends[low] - ascending[low]) + 1)
+        if up_first:
+            runs.append([(worst - high, worst - low), length])
+        else:
+            runs.append([(worst - low, worst - high), length])
+        up += length
+        down -= length
+    if up < total:  # the highest judgment is left alone
+        runs.append([(worst - bisect.bisect_right(ends, up),), 1])
+
+    majority_value = []
+    for i, (pair, length) in enumerate(runs):
+        if i + 1 < len(runs) and runs[i + 1][0] > pair:
+            # What comes next is worse, the longer the run the better.
+            majority_value.append((pair, 1, -length))
+        else:
+            majority_value.append((pair, 0, length))
+
+    return tuple(majority_value)
+
+
+def get_majority_value(tally, mentions):
+    """
+    :param tally: Dict, mention => int
+    :param mentions: List, highest to lowest
+    :return: Tuple, the lower the better.  See `get_majority_value_from_counts`.
+    """
+    return get_majority_value_from_counts([tally[m] for m in mentions])
+
+
 def is_tally_empty(tally):
     for mention in tally:
         if 0 < tally[mention]:
@@ -135,388 +526,3320 @@ def sort_two_candidates(tally_of, mentions, ca, cb):
                 decrement_mention(cotocb, nemdcb)
             else:
                 return positions[nemdca] - positions[nemdcb]
-        log("EXACT EQUALITY FOUND FOR CANDIDATES")
-        log("%s == %s" % (ca, cb))
+        # Exact equality, see `group_tied_candidates` to find them.
         return 0
     else:
         return positions[mdca] - positions[mdcb]
 
 
-def load_judgments_from_string(judgments_string):
+def load_judgments_from_file(judgments_file):
+    """
+    Read the judgments lazily, one row at a time, decompressing gzip, bzip2
+    and xz files on the fly.
+
+    :param judgments_file: File object, or any iterable of CSV lines
+    :return: Generator of rows, each a List of strings
+    """
     judgments_data_reader = csv.reader(
-        StringIO("".join(judgments_string).strip()),
+        decompress_judgments_file(judgments_file),
         skipinitialspace=True,
         delimiter=',',
         lineterminator='\n'
     )
-    # Load it all up in the memory, who cares?
-    judgments_data = []
     for judgments in judgments_data_reader:
-        if not judgments:
+        if not judgments or judgments == ['']:
             #log("Skipping empty line at row %d..." % current_row)
             continue
-        judgments_data.append(judgments)
+        yield judgments
+
+
+class DecompressedFile(TextIOWrapper):
+    """
+    Text of a compressed judgments file, decompressed on the fly.
+    Unlike the file itself, it cannot be read from any offset.
+    """
+
+
+def get_compression(binary_file):
+    """
+    Peek at the first bytes of a file, without consuming them.
+
+    :param binary_file: Buffered binary file object, eg. `sys.stdin.buffer`
+    :return: String, module decompressing the file, or None
+    """
+    if not hasattr(binary_file, 'peek'):
+        return None
+    head = binary_file.peek(max(len(magic) for magic in COMPRESSIONS))
+    for magic, module in COMPRESSIONS.items():
+        if head.startswith(magic):
+            return module
+    return None
+
+
+def decompress_judgments_file(judgments_file, encoding=None):
+    """
+    Decompress a gzip, bzip2 or xz judgments file on the fly, in chunks,
+    as it is read.  Other files are returned untouched.
+
+    :param judgments_file: File object, text or binary, not read yet
+    :param encoding: String, of the decompressed text, defaults to the one
+                     of the file, or UTF-8
+    :return: File object of CSV lines
+    """
+    if isinstance(judgments_file, DecompressedFile):
+        return judgments_file
+    binary_file = getattr(judgments_file, 'buffer', judgments_file)
+    compression = get_compression(binary_file)
+    if compression is None:
+        return judgments_file
+
+    return DecompressedFile(
+        importlib.import_module(compression).open(binary_file, 'rb'),
+        encoding=encoding or getattr(judgments_file, 'encoding', None)
+        or 'utf-8'
+    )
+
+
+def get_plain_filename(judgments_data):
+    """
+    :return: String, path of the uncompressed file of the judgments, which
+             may be read from any offset, or None
+    """
+    if not is_file(judgments_data) \
+            or isinstance(judgments_data, DecompressedFile):
+        return None
+    filename = getattr(judgments_data, 'name', '')
+    if not isinstance(filename, str) or not os.path.isfile(filename):
+        return None
+    return filename
 
-    return judgments_data
+
+def load_judgments_from_string(judgments_string):
+    return list(load_judgments_from_file(
+        StringIO("".join(judgments_string).strip())
+    ))
 
 
 def load_mentions_from_string(ms, sep="\n"):
     return [m.strip() for m in ms.strip().split(sep) if m and m.strip()]
 
 
-def deliberate(judgments_data,
-               mentions,
-               skip_cols=0):
+def read_candidates(judgments_data, skip_cols=0):
+    """
+    Read the candidates in the first row of judgments.  If there are none,
+    name them after the columns of the next row, which is a judge's.
 
-    ignore_blanks = False
-    candidates_list = list()
-    everyones_judgments = dict()
-    skip_rows = 0
-    header_on_row = skip_rows + 0  # toggle 0 to -1 to disable header
+    :param judgments_data: Iterable of rows
+    :return: Tuple (List of candidates, Iterator of the rows of judges)
+    """
+    judgments_data = iter(judgments_data)
+    candidates_list = next(judgments_data, [])[skip_cols:]
 
-    if is_string(judgments_data):
-        judgments_data = load_judgments_from_string(judgments_data)
+    if not candidates_list:
+        for judgments in judgments_data:
+            judgments = judgments[skip_cols:]
+            if judgments:
+                candidates_list = \
+                    ["Candidate %s"%(chr(65+i)) for i in range(len(judgments))]
+                judgments_data = chain([judgments], judgments_data)
+                skip_cols = 0
+                break
 
-    if is_string(mentions):
-        mentions = load_mentions_from_string(mentions)
+    return candidates_list, judgments_data
 
-    current_row = -1
+
+def get_candidates_columns(candidates_list, candidates=None):
+    """
+    Find the columns of some of the candidates, once for all the rows.
+
+    :param candidates_list: List, all the candidates, as in the header
+    :param candidates: List of the candidates to keep, or None for all
+    :return: Tuple (List of the candidates kept, List of their columns,
+             counted after the skipped ones)
+    """
+    if candidates is None:
+        return list(candidates_list), list(range(len(candidates_list)))
+
+    candidates = list(OrderedDict.fromkeys(candidates))
+    positions = get_positions(candidates_list)
+    unknown = [c for c in candidates if c not in positions]
+    if unknown:
+        raise ValueError("Unknown candidates: %s." % ", ".join(unknown))
+
+    return candidates, [positions[c] for c in candidates]
+
+
+def project_tally(candidates_list, tally_matrix, candidates=None):
+    """
+    Keep the tallies of some of the candidates only, once counted.
+
+    :param tally_matrix: numpy array candidates × mentions
+    :param candidates: List of the candidates to keep, or None for all
+    :return: Tuple (List of candidates, numpy array candidates × mentions)
+    """
+    if candidates is None:
+        return candidates_list, tally_matrix
+    candidates, columns = get_candidates_columns(candidates_list, candidates)
+    return candidates, tally_matrix[columns]
+
+
+def encode_judgments(judgments_data, candidates_amount, mentions,
+                     skip_cols=0, profile=None, validation=None,
+                     columns=None):
+    """
+    Encode the judgments of each judge as the positions of the mentions.
+    Blank or missing judgments are the lowest mention.
+
+    :param judgments_data: Iterable of rows of judges, without the header
+    :param mentions: List, highest to lowest
+    :param profile: Profile, counting the `rows` and `blanks`
+    :param validation: Validation, of the unknown mentions.
+                       None to fail on them, once all the rows are read.
+    :param columns: List of the columns to encode, after the skipped ones,
+                    see `get_candidates_columns`.  None for the first
+                    `candidates_amount` ones.
+    :return: Generator of Lists of mentions positions, one per judge
+    """
+    mentions_codes = get_positions(mentions)
+    blank_code = len(mentions) - 1
+    blanks = 0
+    if validation is None:
+        validation = Validation()
+    skip_invalid = validation.on_unknown_mention == 'skip'
+    if columns is None:
+        columns = range(candidates_amount)
+
+    current_row = 0  # the header
     for judgments in judgments_data:
         current_row += 1
 
         judgments = judgments[skip_cols:]
 
-        if current_row < skip_rows:
-            continue
-
-        if current_row == header_on_row:
-            candidates_list = judgments
-            continue
-
         if not judgments:
             log("Skipping empty line at row %d..." % current_row)
             continue
 
-        if not candidates_list:
-            candidates_list = \
-                ["Candidate %s"%(chr(64+i)) for i in range(len(judgments))]
-
-        for i, mention in enumerate(judgments):
+        codes = []
+        valid = True
+        for i in columns:
+            mention = judgments[i] if i < len(judgments) else None
             if mention is None or mention == '':
-                if ignore_blanks:
-                    continue
-                else:
-                    judgments[i] = mentions[-1]
-                    continue
-            if mention not in mentions:
-                log("Found unknown mention `%s' at row %d." % (
-                    mention, current_row
-                ))
-                log("Use --mentions to specify a mentions file.")
-                exit(1)
+                codes.append(blank_code)
+                blanks += 1
+                continue
+            code = mentions_codes.get(mention)
+            if code is None:
+                validation.add_error(current_row, skip_cols + i + 1, mention)
+                valid = False
+                code = blank_code
+            codes.append(code)
+
+        if valid or not skip_invalid:
+            yield codes
+
+    validation.rows += current_row
+
+    if profile is not None:
+        profile.count('rows', current_row)
+        profile.count('blanks', blanks)
+
+    validation.check()
+
+
+def tally_judgments(judgments_data,
+                    mentions,
+                    skip_cols=0,
+                    profile=None,
+                    validation=None,
+                    candidates=None):
+    """
+    Count the judgments into a matrix of candidates × mentions.
 
-        for i in range(len(candidates_list)):
-            candidate = candidates_list[i]
-            if candidate not in everyones_judgments:
-                everyones_judgments[candidate] = list()
-            everyones_judgments[candidate].append(judgments[i])
+    Mentions are encoded as their position in `mentions`, blanks as the
+    lowest mention, and the codes are counted with `np.bincount` by chunks
+    of `TALLY_CHUNK_SIZE`, so that rows may be streamed from a huge file.
 
-    mentions_dict = get_positions(mentions)
+    :param judgments_data: Iterable of rows, the first one holding the candidates
+    :param mentions: List, highest to lowest
+    :param skip_cols: Amount of columns to skip on the left
+    :param profile: Profile, measuring the `parse`, `validate` and `count`
+                    phases, which are interleaved
+    :param validation: Validation, see `encode_judgments`
+    :param candidates: List of the candidates to tally, the other columns
+                       are neither validated nor counted.  None for all.
+    :return: Tuple (List of candidates, numpy array candidates × mentions)
+    """
+    if profile is not None:
+        judgments_data = profile.iterate('parse', judgments_data)
+
+    candidates_list, judgments_data = read_candidates(
+        judgments_data, skip_cols
+    )
+    candidates_list, columns = get_candidates_columns(
+        candidates_list, candidates
+    )
+    candidates_amount = len(candidates_list)
+    mentions_amount = len(mentions)
+    tally_matrix = 0
+    codes = []
+
+    judges_codes = encode_judgments(
+        judgments_data, candidates_amount, mentions, skip_cols, profile,
+        validation, columns
+    )
+    if profile is not None:
+        judges_codes = profile.iterate('validate', judges_codes)
+
+    for judge_codes in judges_codes:
+        codes.extend(judge_codes)
+
+        if len(codes) >= TALLY_CHUNK_SIZE:
+            with profile_phase(profile, 'count'):
+                tally_matrix = tally_matrix + count_codes(
+                    codes, candidates_amount, mentions_amount
+                )
+            codes = []
+
+    with profile_phase(profile, 'count'):
+        tally_matrix = tally_matrix + count_codes(
+            codes, candidates_amount, mentions_amount
+        )
 
-    # Sort the mentions of each candidate.
-    for candidate in everyones_judgments:
-        s = sorted(
-            everyones_judgments[candidate],
-            key=lambda m: mentions_dict[m])
-        everyones_judgments[candidate] = s
+    return candidates_list, tally_matrix
 
-    judgments_tallies = dict()
-    for i in range(len(candidates_list)):
-        candidate = candidates_list[i]
-        if candidate not in judgments_tallies:
-            judgments_tallies[candidate] = dict()
-        for mention in mentions:
-            if mention not in judgments_tallies[candidate]:
-                judgments_tallies[candidate][mention] = 0
-        for mention in everyones_judgments[candidate]:
-            if mention not in judgments_tallies[candidate]:
-                # mention unknown
-                log("Warning: Unknown mention: %s" % mention)
-                judgments_tallies[candidate][mention] = 0
-            judgments_tallies[candidate][mention] += 1
 
-    # log("Candidates")
-    # log(candidates_list)
-    # log(judgments_tallies)
+def count_codes(codes, candidates_amount, mentions_amount):
+    """
+    :param codes: List of mentions positions, row after row of judgments
+    :return: numpy array candidates × mentions
+    """
+    import numpy as np
 
-    def _cmp_candidates(ca, cb):
-        # Here we could hook to external, replaceable classes
-        # to simplify usage of other algorithms.
-        return sort_two_candidates(
-            judgments_tallies,
-            mentions,
-            ca, cb)
+    if not candidates_amount:
+        return np.zeros((0, mentions_amount), dtype=np.intp)
 
-    sorted_candidates = sort_candidates(
-        judgments_tallies,
-        candidates_list,
-        mentions)
+    codes = np.array(codes, dtype=np.intp).reshape(-1, candidates_amount)
+    codes += np.arange(candidates_amount, dtype=np.intp) * mentions_amount
 
-    return sorted_candidates, judgments_tallies
+    return np.bincount(
+        codes.ravel(),
+        minlength=candidates_amount * mentions_amount
+    ).reshape(candidates_amount, mentions_amount)
 
 
-def sort_candidates(judgments_tallies, candidates, mentions):
+def read_lines_between(binary_file, start, end, encoding='utf-8'):
     """
-    :param judgments_tallies: Dict, candidate => mention => int
-    :param candidates: List
-    :param mentions: List, highest to lowest
-    :return:
+    Read the lines of a file from byte `start` up to byte `end`,
+    which should both be at the beginning of a line.
+
+    :return: Generator of decoded lines
     """
-    def _cmp_candidates(ca, cb):
-        # Here we could hook to external, replaceable classes
-        # to simplify usage of other algorithms.
-        return sort_two_candidates(
-            judgments_tallies,
-            mentions,
-            ca, cb
+    binary_file.seek(start)
+    position = start
+    while position < end:
+        line = binary_file.readline()
+        if not line:
+            break
+        position += len(line)
+        yield line.decode(encoding)
+
+
+def ends_in_quotes(line, quoted=False):
+    """
+    :param line: Bytes, a line of a CSV file, with its newline
+    :param quoted: Boolean, whether the line begins inside a quoted field
+    :return: Boolean, whether the line ends inside a quoted field, so that
+             its newline does not end the row
+    """
+    pattern = CSV_QUOTED_REST if quoted else CSV_FIELD
+    position = 0
+    while True:
+        match = pattern.match(line, position)
+        if match.group(1) is not None and match.group(2) is None:
+            return True
+        position = match.end()
+        if line[position:position + 1] != b',':
+            return False
+        position += 1
+        pattern = CSV_FIELD
+
+
+def split_judgments_file(filename, shards, start=0):
+    """
+    Split a CSV file in byte ranges of about the same size, cutting only
+    between rows.  A newline only ends a row outside of quoted fields, which
+    are found like `csv.reader` does, see `ends_in_quotes`.  Only the lines
+    of the blocks holding quotes are read one by one.
+
+    :param shards: Amount of byte ranges wanted, there may be less of them
+    :param start: Byte where the first row begins, eg. after the header
+    :return: List of (start, end) tuples
+    """
+    size = os.path.getsize(filename)
+    boundaries = [start]
+    quoted = False
+
+    with open(filename, 'rb') as binary_file:
+        binary_file.seek(start)
+        position = start
+        for shard in range(1, shards):
+            target = start + (size - start) * shard // shards
+            while position < target:
+                # Blocks of whole lines, as the first one starts a line.
+                block = binary_file.read(min(1 << 20, target - position))
+                block += binary_file.readline()
+                position += len(block)
+                if quoted or b'"' in block:
+                    for line in BytesIO(block):
+                        if quoted or b'"' in line:
+                            quoted = ends_in_quotes(line, quoted)
+            while quoted and position < size:
+                line = binary_file.readline()
+                position += len(line)
+                quoted = ends_in_quotes(line, quoted)
+            if position > boundaries[-1]:
+                boundaries.append(position)
+
+    if size > boundaries[-1]:
+        boundaries.append(size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def tally_judgments_shard(filename, start, end, encoding,
+                          header, mentions, skip_cols=0,
+                          on_unknown_mention='fail', candidates=None):
+    """
+    Count the judgments in a byte range of a CSV file.
+    This runs in the worker processes of `tally_judgments_in_parallel`.
+
+    :return: Tuple (numpy array candidates × mentions, Validation of the
+             range, with rows counted from its start)
+    """
+    # The errors are reported once the rows of all the ranges are known.
+    validation = Validation(
+        'blank' if on_unknown_mention == 'fail' else on_unknown_mention
+    )
+    with open(filename, 'rb') as binary_file:
+        judgments_data = load_judgments_from_file(
+            read_lines_between(binary_file, start, end, encoding)
+        )
+        candidates_list, tally_matrix = tally_judgments(
+            chain([header], judgments_data), mentions, skip_cols,
+            validation=validation, candidates=candidates
         )
+    return tally_matrix, validation
 
-    return sorted(
-        candidates,
-        key=cmp_to_key(_cmp_candidates)
+
+def tally_judgments_in_parallel(filename, mentions, skip_cols=0,
+                                jobs=2, encoding='utf-8', validation=None,
+                                candidates=None):
+    """
+    Count the judgments of a CSV file in `jobs` processes, each one
+    tallying a byte range of the file.  Tallies are sums, so the matrices
+    of all the ranges add up to the one `tally_judgments` would count.
+
+    :param validation: Validation, see `encode_judgments`
+    :param candidates: List of the candidates to tally, see `tally_judgments`
+    :return: Tuple (List of candidates, numpy array candidates × mentions)
+    """
+    if validation is None:
+        validation = Validation()
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with open(filename, 'rb') as binary_file:
+        judgments_data = load_judgments_from_file(
+            read_lines_between(
+                binary_file, 0, os.path.getsize(filename), encoding
+            )
+        )
+        header = next(judgments_data, None)
+        # csv.reader pulls the lines one at a time, so we're right after it.
+        start = binary_file.tell()
+
+    if header is None:
+        return tally_judgments([], mentions, skip_cols, candidates=candidates)
+
+    # Unknown candidates are reported before spawning any process.
+    candidates_list, empty_matrix = tally_judgments(
+        [header], mentions, skip_cols, candidates=candidates
     )
 
+    tally_matrix = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                tally_judgments_shard,
+                filename, shard_start, shard_end, encoding,
+                header, mentions, skip_cols, validation.on_unknown_mention,
+                candidates
+            )
+            for shard_start, shard_end
+            in split_judgments_file(filename, jobs, start)
+        ]
+        for future in futures:
+            shard_matrix, shard_validation = future.result()
+            tally_matrix = tally_matrix + shard_matrix
+            validation.merge(shard_validation)
+
+    validation.check()
+
+    return candidates_list, tally_matrix + empty_matrix
+
+
+def get_checkpoint_anchor(binary_file, offset):
+    """
+    Hash the bytes right before `offset`, to check that a file still holds
+    the rows a checkpoint was made of.  The position in the file is kept.
+
+    :return: String, hexadecimal digest
+    """
+    position = binary_file.tell()
+    start = max(0, offset - CHECKPOINT_ANCHOR_SIZE)
+    binary_file.seek(start)
+    anchor = hashlib.sha256(binary_file.read(offset - start)).hexdigest()
+    binary_file.seek(position)
+    return anchor
+
+
+def save_checkpoint_file(filename, binary_file, row, candidates, mentions,
+                         skip_cols, tally_matrix, errors, errors_amount):
+    """
+    Write the state of a tally, right after the rows read in `binary_file`.
+    The file is written atomically, see `write_file_atomically`.
 
-def plot_merit_profile(judgments_tallies, candidates, mentions, filename=None):
+    :param row: Integer, amount of rows of judges read
+    :param errors: List of JudgmentError found so far
     """
-    :param filename: String, should match `*.png` or `*.pdf`. Paths are allowed.
+    offset = binary_file.tell()
+    write_file_atomically(filename, json.dumps({
+        'format': CHECKPOINT_FILE_FORMAT,
+        'version': CHECKPOINT_FILE_VERSION,
+        'offset': offset,
+        'anchor': get_checkpoint_anchor(binary_file, offset),
+        'row': row,
+        'skip_cols': skip_cols,
+        'mentions': list(mentions),
+        'candidates': list(candidates),
+        'tallies': tally_matrix.tolist(),
+        'errors': [list(error) for error in errors],
+        'errors_amount': errors_amount,
+    }))
+
+
+def load_checkpoint_file(filename):
     """
+    Read a checkpoint written by `save_checkpoint_file`.
 
-    # pprint(judgments_tallies)
-    # pprint("candidates")
-    # pprint(candidates)
-    # pprint("mentions")
-    # pprint(mentions)
+    :return: Dict, with the `tallies` as a numpy array
+    """
+    import numpy as np
+
+    with open(filename) as checkpoint_file:
+        try:
+            content = json.load(checkpoint_file)
+        except ValueError:
+            content = None
+
+    if not isinstance(content, dict) \
+            or content.get('format') != CHECKPOINT_FILE_FORMAT \
+            or content.get('version') != CHECKPOINT_FILE_VERSION:
+        raise ValueError("%s is not a checkpoint of version %d." % (
+            filename, CHECKPOINT_FILE_VERSION
+        ))
 
-    bar_girth = 0.62
-    candidates = [c for c in reversed(candidates)]  # :(|) oOoK
+    content['tallies'] = np.array(content['tallies'], dtype=np.intp).reshape(
+        len(content['candidates']), len(content['mentions'])
+    )
+    return content
 
-    # opinions = [  # for each mention, how many for each candidate
-    #     (20, 35, 30, 35, 27, 30, 35, 27), # excellent
-    #     (25, 32, 34, 20, 25, 30, 35, 27), # etc.
-    #     (25, 32, 34, 20, 25, 30, 35, 27),
-    #     (25, 32, 34, 20, 25, 30, 35, 27),
-    #     (25, 32, 34, 20, 25, 30, 35, 27),
-    #     (20, 35, 30, 35, 27, 30, 35, 27),
-    #     (20, 35, 30, 35, 27, 30, 35, 27),
-    # ]
-
-    opinions = [[judgments_tallies[c][m] for c in candidates] for m in mentions]
-
-    # candidates = ('G1', 'G2', 'G3', 'G4', 'G5')
-    # mentions = (
-    #     u"excellent⋅e",
-    #     u"très bien",
-    #     u"bien",
-    #     u"assez bien",
-    #     u"passable",
-    #     u"insuffisant⋅e",
-    #     u"à rejeter",
-    # )
 
-    colors = (
-        (0, 0.49, 0.24, 1),
-        (0.01, 0.67, 0.35, 1),
-        (0.49, 0.76, 0.22, 1),
-        (0.78, 0.84, 0, 1),
-        (0.99, 0.7, 0, 1),
-        (0.93, 0.43, 0, 1),
-        (0.88, 0.21, 0.11, 1),
-    )
-
-    # candidates = (
-    #     "Tyran Sanguinaire",
-    #     "Chien",
-    #     "Écologiste Décroissant",
-    #     "Capitaliste Prédateur",
-    #     "Imposteur Crapuleux",
-    #     "Nationaliste Identitaire",
-    #     "Camarade Communiste",
-    #     "Marianne",
-    # )
+def tally_judgments_with_checkpoints(filename, mentions, checkpoint_filename,
+                                     skip_cols=0, resume=False,
+                                     interval=CHECKPOINT_INTERVAL,
+                                     encoding='utf-8', validation=None,
+                                     candidates=None):
+    """
+    Count the judgments of a CSV file like `tally_judgments`, saving
+    a checkpoint every `interval` seconds and at the end.  A checkpoint
+    holds the tallies of the rows read so far, and the byte offset of the
+    next one, so that an interrupted tally may resume from there and end
+    up with the very same tallies.
+
+    :param checkpoint_filename: String, path of the checkpoint to write
+    :param resume: Boolean, start from the checkpoint if there is one.
+                   It must have been made of the same file, mentions,
+                   skipped columns and candidates.
+    :param interval: Number of seconds between two checkpoints
+    :param validation: Validation, see `encode_judgments`.  Unknown
+                       mentions before the checkpoint are reported too.
+    :param candidates: List of the candidates to tally, see `tally_judgments`
+    :return: Tuple (List of candidates, numpy array candidates × mentions)
+    """
+    import numpy as np
 
-    candidates_amount = len(candidates)
+    if validation is None:
+        validation = Validation()
 
-    # vlorp = 0.05
-    barhs = []
-    legends = []
-    separators = []
-    ind = [i for i in range(candidates_amount)]
-    leftOffset = (0,) * candidates_amount
-    judgments_sum = (0,) * candidates_amount
+    with open(filename, 'rb') as binary_file:
+        size = os.path.getsize(filename)
+        judgments_data = load_judgments_from_file(
+            read_lines_between(binary_file, 0, size, encoding)
+        )
+        candidates_list, judgments_data = read_candidates(
+            judgments_data, skip_cols
+        )
+        candidates_list, columns = get_candidates_columns(
+            candidates_list, candidates
+        )
+        candidates_amount = len(candidates_list)
+        mentions_amount = len(mentions)
+        tally_matrix = np.zeros(
+            (candidates_amount, mentions_amount), dtype=np.intp
+        )
 
-    for opinion, mention in zip(opinions, mentions):
-        judgments_sum = tuple(p + q for p, q in zip(opinion, judgments_sum))
-    judgments_count = max(judgments_sum)
+        if resume and os.path.isfile(checkpoint_filename):
+            checkpoint = load_checkpoint_file(checkpoint_filename)
+            offset = checkpoint['offset']
+            if checkpoint['candidates'] != candidates_list \
+                    or checkpoint['mentions'] != list(mentions) \
+                    or checkpoint['skip_cols'] != skip_cols \
+                    or offset > size \
+                    or checkpoint['anchor'] != get_checkpoint_anchor(
+                        binary_file, offset):
+                raise ValueError(
+                    "The checkpoint %s was not made of %s with these "
+                    "mentions." % (checkpoint_filename, filename)
+                )
+            tally_matrix = checkpoint['tallies']
+            validation.rows = checkpoint['row']
+            validation.errors = [
+                JudgmentError(*error) for error in checkpoint['errors']
+            ]
+            validation.errors_amount = checkpoint['errors_amount']
+            judgments_data = load_judgments_from_file(
+                read_lines_between(binary_file, offset, size, encoding)
+            )
+
+        # Rows are counted as they are read, so that when a judge's codes
+        # come out of `encode_judgments`, all the rows up to theirs were read.
+        rows_read = [0]
+
+        def count_rows(rows):
+            for row in rows:
+                rows_read[0] += 1
+                yield row
+
+        # The errors are reported once the rows before the checkpoint are too.
+        resumed = Validation(
+            'blank' if validation.on_unknown_mention == 'fail'
+            else validation.on_unknown_mention
+        )
 
-    vlorp = judgments_count * 0.003 * 0
+        def save_checkpoint():
+            save_checkpoint_file(
+                checkpoint_filename, binary_file,
+                validation.rows + rows_read[0],
+                candidates_list, mentions, skip_cols, tally_matrix,
+                (validation.errors + [
+                    error._replace(row=error.row + validation.rows)
+                    for error in resumed.errors
+                ])[:validation.max_errors],
+                validation.errors_amount + resumed.errors_amount
+            )
+
+        codes = []
+        last_checkpoint = time.monotonic()
+        for judge_codes in encode_judgments(
+                count_rows(judgments_data), candidates_amount, mentions,
+                skip_cols, validation=resumed, columns=columns):
+            codes.extend(judge_codes)
+            due = time.monotonic() - last_checkpoint >= interval
+            if due or len(codes) >= TALLY_CHUNK_SIZE:
+                tally_matrix += count_codes(
+                    codes, candidates_amount, mentions_amount
+                )
+                codes = []
+            if due:
+                save_checkpoint()
+                last_checkpoint = time.monotonic()
+
+        tally_matrix += count_codes(codes, candidates_amount, mentions_amount)
+        save_checkpoint()
+
+    validation.merge(resumed)
+    validation.check()
+
+    return candidates_list, tally_matrix
+
+
+def tally_liquid_judgments(judgments_data,
+                           mentions,
+                           skip_cols=0,
+                           validation=None):
+    """
+    Count the judgments of a liquid poll, where judges may delegate.
 
-    for i, mention in enumerate(mentions):
-        #print(u"Plotting bars of mention %s…" % mention)
-        opinion = opinions[i]
-        barh = plt.barh(ind, opinion, bar_girth, left=leftOffset, color=colors[i])
-        barhs.append(barh)
-        legends.append(barh[0])
-
-        if i > 0:
-            for j, offset in enumerate(leftOffset):
-                separators.append([
-                    (offset, j-0.5),
-                    (offset, j+0.5),
-                ])
+    The first column holds the name of each judge.  Instead of a mention,
+    a judge may write `@name` to delegate their judgment of a candidate to
+    another judge, or give a single `@name` to delegate their whole ballot.
+    Delegation chains are followed to the judge who actually gave a mention,
+    whose judgment then weighs as much as the judges delegating to them.
+    Cycles and delegations to unknown judges fall back to a blank.
 
-        # At some point, we should either go full numpy or not at all
-        # The vlorp is a nasty hack to show white separators between colors
-        leftOffset = tuple(p + q + (vlorp if p else 0) for p, q in zip(opinion, leftOffset))
+    When a judge appears on more than one row, their last ballot is kept.
 
-    # p1 = plt.barh(ind, menMeans, bar_girth)
-    # p2 = plt.barh(ind, womenMeans, bar_girth, left=menMeans)
+    :param judgments_data: Iterable of rows, the first one holding the candidates
+    :param mentions: List, highest to lowest
+    :param skip_cols: Amount of columns to skip on the left
+    :param validation: Validation, see `encode_judgments`
+    :return: Tuple (List of candidates, numpy array candidates × mentions)
+    """
+    candidates_list = list()
+    header_on_row = 0
+    if validation is None:
+        validation = Validation()
+    skip_invalid = validation.on_unknown_mention == 'skip'
 
-    adjusted_width = max(leftOffset)
+    mentions_codes = get_positions(mentions)
+    blank_code = len(mentions) - 1
+    judges = dict()  # name => index
+    codes = array('h')  # row after row, DELEGATED where delegated
+    delegations = dict()  # index in codes => name of the delegate
 
-    plt.title('Merit Profiles')
-    plt.ylabel('Candidates')
-    plt.yticks(ind, candidates)
-    plt.xlabel('Mentions given')
-    plt.xticks([adjusted_width - vlorp], [judgments_count])
-    # plt.xticks(np.arange(0, 81, 10))
+    current_row = -1
+    for judgments in judgments_data:
+        current_row += 1
 
-    plt.legend(
-            legends, mentions,
-            ncol=len(mentions),
-            loc='upper center',
-            prop={'size': 6},
-            fancybox=True,
-            shadow=True,
-            bbox_to_anchor=(0.5, -0.15),
-    )
+        judgments = judgments[skip_cols:]
 
-    from matplotlib.collections import LineCollection
-    # lines = [[(10.0,1.0), (0.0,0.0)]]
-    lc = LineCollection(separators,
-        colors=((1,1,1,1),),
-        linewidths=2,
-    )
+        if current_row == header_on_row:
+            candidates_list = judgments[1:]
+            continue
 
-    # fig, ax = plt.subplots()
-    # ax.add_collection(lc)
-    plt.gca().add_collection(lc)
+        if not judgments:
+            log("Skipping empty line at row %d..." % current_row)
+            continue
 
-    plt.axvline(x=adjusted_width*0.5, linestyle='--')
+        candidates_amount = len(candidates_list)
+        judge, judgments = judgments[0], judgments[1:]
 
-    # ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.05, fancybox=True, shadow=True, ncol=5)
-    # ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.05, fancybox=True, shadow=True, ncol=5)
+        if len(judgments) == 1 and candidates_amount > 1 \
+                and judgments[0].startswith(DELEGATION_PREFIX):
+            judgments = judgments * candidates_amount
 
-    mng = plt.get_current_fig_manager()
-    mng.full_screen_toggle()
+        row_codes = []
+        row_delegations = dict()  # candidate => name of the delegate
+        valid = True
+        for i in range(candidates_amount):
+            mention = judgments[i] if i < len(judgments) else None
+            if mention is None or mention == '':
+                row_codes.append(blank_code)
+                continue
+            if mention.startswith(DELEGATION_PREFIX):
+                row_codes.append(DELEGATED)
+                row_delegations[i] = mention[len(DELEGATION_PREFIX):]
+                continue
+            code = mentions_codes.get(mention)
+            if code is None:
+                validation.add_error(current_row, skip_cols + i + 2, mention)
+                valid = False
+                code = blank_code
+            row_codes.append(code)
+
+        if not valid and skip_invalid:
+            continue
 
-    if filename is not None:
-        # plt.savefig(filename)
-        plt.savefig(filename, dpi=200, bbox_inches='tight')
-    else:
-        plt.show()
-    plt.clf()
+        if judge and judge in judges:
+            start = judges[judge] * candidates_amount
+        else:
+            start = len(codes)
+            codes.extend([blank_code] * candidates_amount)
+            if judge:
+                judges[judge] = start // candidates_amount
 
+        for i, code in enumerate(row_codes):
+            codes[start + i] = code
+            delegations.pop(start + i, None)
+        for i, delegate in row_delegations.items():
+            delegations[start + i] = delegate
 
-def main(args_parser, args):  # move to bottom, no need for a func
-    log("MAJORITY JUDGMENT POLLING -- Version %s" % __version__)
+    validation.rows += current_row
+    validation.check()
 
-    # In decreasing order.
-    default_mentions = [
-        'EXCELLENT',
-        'VERY GOOD',
-        'GOOD',
-        'SOMEWHAT GOOD',
-        'PASSABLE',
-        'POOR',
-        'REJECT',
-    ]
-    if not args.mentions_file:
-        mentions = default_mentions
-    else:
-        with open(args.mentions_file) as f:
-            mentions = [l.strip() for l in f.readlines() if l and l.strip()]
+    candidates_amount = len(candidates_list)
 
-    log("\nGoing to use the following mentions:")
-    log(''+(', '.join(mentions)))
+    delegate_of = [dict() for _ in candidates_list]  # per candidate
+    for index, delegate in delegations.items():
+        judge, c = divmod(index, candidates_amount)
+        delegate_of[c][judge] = judges.get(delegate)
 
-    if args.input_file is None:
-        exit(1)
+    for c in range(candidates_amount):
+        if delegate_of[c]:
+            codes[c::candidates_amount] = array('h', resolve_delegations(
+                codes[c::candidates_amount].tolist(),
+                delegate_of[c],
+                blank_code
+            ))
 
-    log("\nWaiting for input judgments...")
-    log("(use CTRL+D to exit)")
-    input_csv_strings = args.input_file.readlines()
+    tally_matrix = count_codes(codes, candidates_amount, len(mentions))
 
-    if not input_csv_strings:
-        log("Please provide an input CSV file.")
-        args_parser.print_help()
-        args_parser.exit(1)
+    return candidates_list, tally_matrix
 
-    judgments_data = load_judgments_from_string(input_csv_strings)
 
-    log("\nRead judgments from %d judges." % (len(judgments_data)-1))
+def tally_aggregated_judgments(counts_data, mentions, validation=None):
+    """
+    Read tallies that were already counted, without any ballot.
 
-    deliberation, tally = deliberate(
-        judgments_data, mentions,
-        int(args.skip_cols)
-    )
+    Rows are `candidate,mention,count`, with an optional header, and the
+    counts of the same candidate and mention add up.  Candidates with fewer
+    judgments than the others get blank ones, the lowest mention, like
+    missing judgments of a ballot.
 
-    log("\nDELIBERATION")
-    for i, candidate in enumerate(deliberation):
-        log("%02d.\t%18s\t%s" % (
-            i+1,
-            get_median(tally[candidate], mentions),
-            candidate,
-        ))
+    :param counts_data: Iterable of rows [candidate, mention, count],
+                        or Dict, candidate => mention => int
+    :param mentions: List, highest to lowest
+    :param validation: Validation, see `encode_judgments`
+    :return: Tuple (List of candidates, numpy array candidates × mentions)
+    """
+    import numpy as np
 
+    if isinstance(counts_data, dict):
+        counts_data = (
+            (candidate, mention, count)
+            for candidate, tally in counts_data.items()
+            for mention, count in tally.items()
+        )
+    if validation is None:
+        validation = Validation()
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
+    mentions_codes = get_positions(mentions)
+    blank_code = len(mentions) - 1
+    candidates_indices = OrderedDict()  # candidate => row of the matrix
+    counts = []
 
-    # Optional argument flag which defaults to False
-    # parser.add_argument(
-    #     '-f',
-    #     '--flag',
-    #     action="store_true",
-    #     default=False,
-    #     help=""
-    # )
+    current_row = 0
+    for row in counts_data:
+        current_row += 1
+        if len(row) != 3:
+            raise ValueError("Expected candidate,mention,count at row %d." % (
+                current_row
+            ))
+        candidate, mention, count = row
+        try:
+            count = int(count)
+        except ValueError:
+            # Only the first row may be a header, rows keep their numbers.
+            if current_row == 1:
+                continue
+            raise ValueError("Invalid count `%s' at row %d." % (
+                count, current_row
+            ))
+        if count < 0:
+            raise ValueError("Negative count at row %d." % current_row)
+
+        if mention is None or mention == '':
+            code = blank_code
+        else:
+            code = mentions_codes.get(mention)
+            if code is None:
+                validation.add_error(current_row, 2, mention)
+                if validation.on_unknown_mention == 'skip':
+                    continue
+                code = blank_code
 
-    parser.add_argument(
-        'input_file',
-        nargs='?',
-        type=argparse.FileType('r'),
-        help="A CSV file with the judgments.",
-        default=sys.stdin
-    )
+        index = candidates_indices.setdefault(candidate, len(counts))
+        if index == len(counts):
+            counts.append([0] * len(mentions))
+        counts[index][code] += count
 
-    parser.add_argument(
-        "-m",
-        "--mentions",
-        action="store",
-        dest="mentions_file",
-        help="""
-        A text file with one mention per line,
-        in order from highest to lowest.
-        """
+    validation.rows += current_row
+    validation.check()
+
+    tally_matrix = np.array(counts, dtype=np.intp).reshape(
+        len(counts), len(mentions)
     )
+    if len(counts) and len(mentions):
+        totals = tally_matrix.sum(axis=1)
+        tally_matrix[:, -1] += totals.max() - totals
 
-    parser.add_argument(
-        "--skip-cols",
-        action="store",
-        default=0,
-        dest="skip_cols",
-        help="Amount of columns to skip on the left."
+    return list(candidates_indices), tally_matrix
+
+
+def resolve_delegations(codes, delegate_of, blank_code):
+    """
+    Follow the delegation chains without recursion, in linear time:
+    each judge is walked over once, and then remembers their mention.
+
+    :param codes: List, mention position of each judge, DELEGATED if delegated
+    :param delegate_of: Dict, judge => judge they delegate to, None if unknown
+    :param blank_code: Position of the mention to fall back to
+    :return: List, mention position of each judge
+    """
+    resolving = DELEGATED - 1
+    resolved = list(codes)
+
+    for judge in delegate_of:
+        path = []
+        current = judge
+        while current is not None and resolved[current] == DELEGATED:
+            resolved[current] = resolving
+            path.append(current)
+            current = delegate_of[current]
+
+        if current is None or resolved[current] == resolving:
+            code = blank_code  # unknown delegate, or cycle
+        else:
+            code = resolved[current]
+
+        for delegating in path:
+            resolved[delegating] = code
+
+    return resolved
+
+
+def convert_judgments_to_store(judgments_data, filename, mentions,
+                               skip_cols=0, validation=None):
+    """
+    Write the judgments in a binary file, made for fast deliberations.
+
+    After a small header holding the candidates and mentions, the file holds
+    one column of bytes per candidate, each byte being the position of the
+    mention given by a judge.  Rows are streamed, each column being buffered
+    in a temporary file until we know how many judges there are.
+
+    :param judgments_data: Iterable of rows, the first one holding the candidates
+    :param filename: String, path of the store to write
+    :param mentions: List, highest to lowest, at most STORE_MAX_MENTIONS
+    :param validation: Validation, see `encode_judgments`.
+                       Nothing is written if it fails.
+    :return: JudgmentsStore
+    """
+    import numpy as np
+
+    if len(mentions) > STORE_MAX_MENTIONS:
+        raise ValueError("Stores hold at most %d mentions, not %d." % (
+            STORE_MAX_MENTIONS, len(mentions)
+        ))
+
+    candidates_list, judgments_data = read_candidates(
+        judgments_data, skip_cols
+    )
+    candidates_amount = len(candidates_list)
+    judges_amount = 0
+    columns = [tempfile.TemporaryFile() for _ in candidates_list]
+
+    def _write_columns(codes):
+        block = np.array(codes, dtype=np.uint8).reshape(-1, candidates_amount)
+        for i, column in enumerate(columns):
+            column.write(block[:, i].tobytes())
+
+    try:
+        codes = []
+        for judge_codes in encode_judgments(
+                judgments_data, candidates_amount, mentions, skip_cols,
+                validation=validation):
+            codes.extend(judge_codes)
+            judges_amount += 1
+            if len(codes) >= TALLY_CHUNK_SIZE:
+                _write_columns(codes)
+                codes = []
+        if codes:
+            _write_columns(codes)
+
+        header = json.dumps({
+            'candidates': candidates_list,
+            'mentions': list(mentions),
+            'judges': judges_amount,
+        }).encode('utf-8')
+        offset = len(STORE_MAGIC) + 4 + len(header)
+        padding = -offset % 8
+
+        with open(filename, 'wb') as store_file:
+            store_file.write(STORE_MAGIC)
+            store_file.write(struct.pack('<I', len(header) + padding))
+            store_file.write(header + b' ' * padding)
+            for column in columns:
+                column.seek(0)
+                shutil.copyfileobj(column, store_file)
+    finally:
+        for column in columns:
+            column.close()
+
+    return load_judgments_store(filename)
+
+
+def is_judgments_store(filename):
+    """
+    :return: Boolean, whether the file is a store of judgments
+    """
+    if not os.path.isfile(filename):
+        return False
+    with open(filename, 'rb') as store_file:
+        return store_file.read(len(STORE_MAGIC)) == STORE_MAGIC
+
+
+def load_judgments_store(filename):
+    """
+    Read the header of a store written by `convert_judgments_to_store`.
+    The judgments themselves are only read when tallying.
+
+    :return: JudgmentsStore
+    """
+    with open(filename, 'rb') as store_file:
+        if store_file.read(len(STORE_MAGIC)) != STORE_MAGIC:
+            raise ValueError("%s is not a store of judgments." % filename)
+        header_size = struct.unpack('<I', store_file.read(4))[0]
+        header = json.loads(store_file.read(header_size).decode('utf-8'))
+
+    return JudgmentsStore(
+        filename=filename,
+        candidates=header['candidates'],
+        mentions=header['mentions'],
+        judges=header['judges'],
+        offset=len(STORE_MAGIC) + 4 + header_size,
+    )
+
+
+def open_judgments_file(filename, encoding='utf-8'):
+    """
+    Open the judgments of a binary store, or of a CSV file.  Compressed
+    CSV files are decompressed as they are read, see `load_judgments_from_file`.
+
+    :param filename: String, path of the file, or '-' for stdin
+    :return: JudgmentsStore, or file object
+    """
+    if filename == '-':
+        return sys.stdin
+    if is_judgments_store(filename):
+        return load_judgments_store(filename)
+    return open(filename, 'r', encoding=encoding)
+
+
+def tally_judgments_store(store, candidates=None):
+    """
+    Count the judgments of a store, memory-mapping its columns of bytes.
+    Only the columns of the candidates tallied are read from the disk.
+
+    :param store: JudgmentsStore
+    :param candidates: List of the candidates to tally, or None for all
+    :return: Tuple (List of candidates, numpy array candidates × mentions)
+    """
+    import numpy as np
+
+    candidates_list, indices = get_candidates_columns(
+        store.candidates, candidates
+    )
+    mentions_amount = len(store.mentions)
+    tally_matrix = np.zeros((len(indices), mentions_amount), dtype=np.intp)
+
+    if indices and store.judges:
+        columns = np.memmap(
+            store.filename,
+            dtype=np.uint8,
+            mode='r',
+            offset=store.offset,
+            shape=(len(store.candidates), store.judges)
+        )
+        for i, column in enumerate(indices):
+            tally_matrix[i] = np.bincount(
+                columns[column], minlength=mentions_amount
+            )
+        del columns
+
+    return candidates_list, tally_matrix
+
+
+def save_tally_file(filename, candidates, mentions, tally_matrix):
+    """
+    Write a tally matrix in a JSON file, along with its candidates and mentions.
+    The file is written atomically, see `write_file_atomically`.
+
+    :param tally_matrix: numpy array candidates × mentions
+    """
+    write_file_atomically(filename, json.dumps({
+        'format': TALLY_FILE_FORMAT,
+        'version': TALLY_FILE_VERSION,
+        'mentions': list(mentions),
+        'candidates': list(candidates),
+        'tallies': tally_matrix.tolist(),
+    }))
+
+
+def write_file_atomically(filename, content):
+    """
+    Write the file aside and then move it, so it's never seen half-written.
+
+    :param content: String
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    descriptor, temporary_filename = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(descriptor, 'w') as tally_file:
+            tally_file.write(content)
+        os.replace(temporary_filename, filename)
+    except BaseException:
+        os.unlink(temporary_filename)
+        raise
+
+
+def load_tally_file(filename):
+    """
+    Read a tally file written by `save_tally_file`.
+
+    :return: Tuple (List of candidates, List of mentions, numpy array)
+    """
+    import numpy as np
+
+    with open(filename) as tally_file:
+        try:
+            content = json.load(tally_file)
+        except ValueError:
+            content = None
+
+    if not isinstance(content, dict) \
+            or content.get('format') != TALLY_FILE_FORMAT \
+            or content.get('version') != TALLY_FILE_VERSION:
+        raise ValueError("%s is not a tally file of version %d." % (
+            filename, TALLY_FILE_VERSION
+        ))
+
+    tally_matrix = np.array(content['tallies'], dtype=np.intp).reshape(
+        len(content['candidates']), len(content['mentions'])
+    )
+
+    return content['candidates'], content['mentions'], tally_matrix
+
+
+def merge_tally_files(filenames):
+    """
+    Sum the partial tallies of the same poll, counted apart.
+    Their mentions must be the same, and their candidates too,
+    in any order.
+
+    :param filenames: List of paths of files written by `save_tally_file`
+    :return: Tuple (List of candidates, List of mentions, numpy array)
+    """
+    candidates = mentions = tally_matrix = None
+    for filename in filenames:
+        file_candidates, file_mentions, file_matrix = load_tally_file(filename)
+
+        if tally_matrix is None:
+            candidates, mentions, tally_matrix = \
+                file_candidates, file_mentions, file_matrix
+            candidates_indices = get_positions(candidates)
+            continue
+
+        if file_mentions != mentions:
+            raise ValueError("%s was counted with other mentions: %s." % (
+                filename, ", ".join(file_mentions)
+            ))
+        if sorted(file_candidates) != sorted(candidates) \
+                or len(set(file_candidates)) != len(file_candidates):
+            raise ValueError("%s has other candidates: %s." % (
+                filename, ", ".join(file_candidates)
+            ))
+
+        tally_matrix[[candidates_indices[c] for c in file_candidates]] += \
+            file_matrix
+
+    if tally_matrix is None:
+        raise ValueError("No tally files to merge.")
+
+    return candidates, mentions, tally_matrix
+
+
+def get_default_cache_dir():
+    cache_home = os.environ.get('XDG_CACHE_HOME') \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'limaju')
+
+
+def get_tally_cache_key(filename, mentions, skip_cols=0, liquid=False,
+                        candidates=None):
+    """
+    Hash the bytes of a judgments file, and everything else the tally
+    depends upon, so that a tally is cached for these exact judgments.
+
+    :return: String, hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    parameters = [
+        TALLY_FILE_VERSION, list(mentions), int(skip_cols), bool(liquid)
+    ]
+    if candidates is not None:
+        parameters.append(list(candidates))
+    digest.update(json.dumps(parameters).encode('utf-8'))
+    with open(filename, 'rb') as judgments_file:
+        for block in iter(lambda: judgments_file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cached_tally(cache_dir, cache_key):
+    """
+    :return: Tuple (List of candidates, numpy array), or None if not cached
+    """
+    filename = os.path.join(cache_dir, cache_key + TALLY_CACHE_SUFFIX)
+    try:
+        candidates, mentions, tally_matrix = load_tally_file(filename)
+    except (OSError, ValueError):
+        return None
+
+    os.utime(filename)  # recently used, evicted last
+    return candidates, tally_matrix
+
+
+def save_cached_tally(cache_dir, cache_key, candidates, mentions, tally_matrix,
+                      cache_size=TALLY_CACHE_SIZE):
+    """
+    Cache a tally, then evict the least recently used tallies until
+    the cache is no bigger than `cache_size` bytes.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    save_tally_file(
+        os.path.join(cache_dir, cache_key + TALLY_CACHE_SUFFIX),
+        candidates, mentions, tally_matrix
+    )
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(TALLY_CACHE_SUFFIX):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total_size = sum(size for mtime, size, name in entries)
+    for mtime, size, name in sorted(entries):
+        if total_size <= cache_size:
+            break
+        os.unlink(os.path.join(cache_dir, name))
+        total_size -= size
+
+
+def get_tallies_from_matrix(tally_matrix, candidates, mentions):
+    """
+    :param tally_matrix: numpy array candidates × mentions
+    :return: Dict, candidate => mention => int
+    """
+    judgments_tallies = dict()
+    for candidate, counts in zip(candidates, tally_matrix.tolist()):
+        judgments_tallies[candidate] = dict(zip(mentions, counts))
+    return judgments_tallies
+
+
+def get_matrix_from_tallies(judgments_tallies, candidates, mentions):
+    """
+    :param judgments_tallies: Dict, candidate => mention => int
+    :return: numpy array candidates × mentions
+    """
+    import numpy as np
+
+    return np.array(
+        [[judgments_tallies[c][m] for m in mentions] for c in candidates],
+        dtype=np.intp
+    ).reshape(len(candidates), len(mentions))
+
+
+def get_medians_from_matrix(tally_matrix):
+    """
+    Medians of all the candidates at once, from the cumulative counts.
+    Like `get_median`, this is the low median, and the lowest mention
+    when a candidate has no judgments at all.
+
+    :param tally_matrix: numpy array candidates × mentions, or any array
+                         with the mentions on its last axis
+    :return: numpy array of mentions positions, one per candidate
+    """
+    import numpy as np
+
+    ascending = tally_matrix[..., ::-1].cumsum(axis=-1)  # lowest to highest
+    median_index = (ascending[..., -1] - 1) // 2
+    lowest_to_median = \
+        (ascending > median_index[..., np.newaxis]).argmax(axis=-1)
+    return tally_matrix.shape[-1] - 1 - lowest_to_median
+
+
+def get_majority_gauges_from_matrix(tally_matrix):
+    """
+    Majority gauges of all the candidates at once, as scores.
+
+    The gauge of a candidate is its median, then the share of judgments
+    above it if there are more of those than below, else minus the share of
+    judgments below it.  With the low median, the share above is at most one
+    half, eg. for [REJECT, EXCELLENT], and the share below is always under
+    one half, so that adding them to the median gives a score within
+    (median - 1/2, median + 1/2], the higher the better, ordering candidates
+    like the first steps of their majority values.
+
+    :param tally_matrix: numpy array candidates × mentions, or any array
+                         with the mentions on its last axis
+    :return: numpy array of floats, one per candidate
+    """
+    import numpy as np
+
+    grades, above, below = get_median_shares_from_matrix(tally_matrix)
+    return grades + np.where(above > below, above, -below)
+
+
+def get_median_shares_from_matrix(tally_matrix):
+    """
+    Medians of all the candidates at once, as grades, with the shares of
+    their judgments above and below them, from which the majority gauge
+    and the typical, usual and central judgments are scored.
+
+    :param tally_matrix: numpy array candidates × mentions, or any array
+                         with the mentions on its last axis
+    :return: Tuple of numpy arrays (median grades, the lowest mention being
+             0, shares above, shares below), one per candidate
+    """
+    import numpy as np
+
+    tally_matrix = np.asarray(tally_matrix)
+    medians = get_medians_from_matrix(tally_matrix)[..., np.newaxis]
+    totals = np.maximum(tally_matrix.sum(axis=-1), 1)
+    positions = np.arange(tally_matrix.shape[-1])
+    above = np.where(positions < medians, tally_matrix, 0).sum(axis=-1)
+    below = np.where(positions > medians, tally_matrix, 0).sum(axis=-1)
+
+    return (
+        tally_matrix.shape[-1] - 1 - medians[..., 0],
+        above / totals,
+        below / totals,
+    )
+
+
+def get_typical_judgment_scores(tally_matrix):
+    """
+    Typical judgments of all the candidates at once: the median grade,
+    plus the share of judgments above it, minus the share below it.
+
+    :return: numpy array of floats, one per candidate, the higher the better
+    """
+    grades, above, below = get_median_shares_from_matrix(tally_matrix)
+    return grades + above - below
+
+
+def get_usual_judgment_scores(tally_matrix):
+    """
+    Usual judgments of all the candidates at once: the median grade, plus
+    the difference of the shares above and below it, over twice the share
+    of the judgments of the median grade.
+
+    :return: numpy array of floats, one per candidate, the higher the better
+    """
+    grades, above, below = get_median_shares_from_matrix(tally_matrix)
+    # The median grade holds some judgments, unless there are none at all.
+    return grades + (above - below) / (2 * (1 - above - below))
+
+
+def get_central_judgment_scores(tally_matrix):
+    """
+    Central judgments of all the candidates at once: the median grade, plus
+    half the difference of the shares above and below it, over their sum.
+
+    :return: numpy array of floats, one per candidate, the higher the better
+    """
+    import numpy as np
+
+    grades, above, below = get_median_shares_from_matrix(tally_matrix)
+    spread = above + below
+    return grades + np.where(
+        spread > 0, (above - below) / (2 * np.where(spread > 0, spread, 1)), 0
+    )
+
+
+def bootstrap_ranks(tally_matrix, replicates=1000, seed=None):
+    """
+    How robust is the ranking?  Resample the judges of the poll, many times,
+    and count how often each candidate lands at each rank.
+
+    The judgments of each candidate are drawn with multinomial draws from
+    their tally, batches of replicates at once, and each replicate is ranked
+    by majority gauge, see `get_majority_gauges_from_matrix`.  Candidates
+    with the same gauge keep their order in the matrix, so give the rows in
+    the order of the actual ranking.
+
+    :param tally_matrix: numpy array candidates × mentions
+    :param replicates: Amount of resampled polls
+    :param seed: Seed of the random draws, None for a random one
+    :return: numpy array candidates × ranks, amounts of replicates
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    candidates_amount, mentions_amount = tally_matrix.shape
+    totals = tally_matrix.sum(axis=1)
+    probabilities = tally_matrix / np.maximum(totals, 1)[:, np.newaxis]
+    probabilities[totals == 0, -1] = 1.0
+
+    rank_counts = np.zeros((candidates_amount, candidates_amount), np.intp)
+    batch_size = max(1, BOOTSTRAP_BATCH_SIZE // max(1, tally_matrix.size))
+    ranks = np.arange(candidates_amount)
+
+    done = 0
+    while done < replicates:
+        batch = min(batch_size, replicates - done)
+        samples = rng.multinomial(
+            totals, probabilities, size=(batch, candidates_amount)
+        )
+        scores = get_majority_gauges_from_matrix(samples)
+        order = np.argsort(-scores, axis=1, kind='stable')  # best first
+        rank_of = np.empty_like(order)
+        np.put_along_axis(
+            rank_of, order, np.broadcast_to(ranks, order.shape), axis=1
+        )
+        rank_counts += np.bincount(
+            (ranks * candidates_amount + rank_of).ravel(),
+            minlength=candidates_amount * candidates_amount
+        ).reshape(candidates_amount, candidates_amount)
+        done += batch
+
+    return rank_counts
+
+
+def parse_timestamp(text, timestamp_format=None):
+    """
+    :param text: String, like `12/8/2019 12:33:54` or `2019-12-08 12:33:54`
+    :param timestamp_format: String, for `datetime.strptime`.
+                             None to try the TIMESTAMP_FORMATS.
+    :return: datetime
+    """
+    from datetime import datetime
+
+    text = text.strip()
+    for candidate_format in (timestamp_format,) if timestamp_format \
+            else TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(text, candidate_format)
+        except ValueError:
+            pass
+    raise ValueError("Unknown timestamp format `%s'." % text)
+
+
+def parse_duration(text):
+    """
+    :param text: String, an amount and a unit among DURATION_UNITS, eg. `15m`
+    :return: timedelta
+    """
+    from datetime import timedelta
+
+    text = text.strip()
+    try:
+        seconds = float(text[:-1]) * DURATION_UNITS[text[-1:]]
+    except (ValueError, KeyError):
+        raise ValueError("Invalid duration `%s', try eg. 30s, 15m, 1h, 2d." % (
+            text
+        ))
+    if seconds <= 0:
+        raise ValueError("Durations must be positive, not `%s'." % text)
+    return timedelta(seconds=seconds)
+
+
+def deliberate_over_time(judgments_data,
+                         mentions,
+                         period,
+                         window=None,
+                         skip_cols=1,
+                         timestamp_col=0,
+                         timestamp_format=None,
+                         validation=None):
+    """
+    Deliberate at the end of each period, in a single pass over the rows,
+    sorted by their timestamps.  Tallies are updated row by row, and the
+    rows leaving the window are removed from them as the time goes by.
+
+    Periods are aligned on multiples of `period` since 1970.  Boundaries
+    where nothing changed since the previous one are not deliberated,
+    and the last one is the end of the period of the last row.
+
+    :param judgments_data: String (CSV), file object or Iterable of rows,
+                           candidates first
+    :param mentions: String (one per line) or List, highest to lowest
+    :param period: timedelta, between two deliberations
+    :param window: timedelta, the time before each deliberation to count
+                   the judges of.  `period` for tumbling windows.
+                   None to count all the judges so far.
+    :param skip_cols: Amount of columns to skip on the left, with the
+                      timestamps among them
+    :param timestamp_col: Integer, index of the column of the timestamps
+    :param timestamp_format: String, see `parse_timestamp`
+    :param validation: Validation, see `encode_judgments`
+    :return: Generator of Tuples (datetime of the end of the period,
+             List of candidates best first, Dict of tallies)
+    """
+    from collections import deque
+    from datetime import datetime
+
+    if is_string(mentions):
+        mentions = load_mentions_from_string(mentions)
+    if is_string(judgments_data):
+        judgments_data = StringIO(judgments_data.strip())
+    if is_file(judgments_data):
+        judgments_data = load_judgments_from_file(judgments_data)
+
+    candidates_list, judgments_data = read_candidates(
+        judgments_data, skip_cols
+    )
+    live_tally = LiveTally(candidates_list, mentions)
+    epoch = datetime(1970, 1, 1)
+
+    def get_boundary_after(moment):
+        return epoch + ((moment - epoch) // period + 1) * period
+
+    # `encode_judgments` yields the codes of a row right after reading it,
+    # so the timestamp of the codes it yields is the last one read here.
+    last_times = [None]
+
+    def read_times(rows):
+        for row_number, row in enumerate(rows, 1):
+            if timestamp_col >= len(row):
+                raise ValueError("No timestamp at row %d." % row_number)
+            moment = parse_timestamp(row[timestamp_col], timestamp_format)
+            if last_times[0] is not None and moment < last_times[0]:
+                raise ValueError(
+                    "Timestamps go back in time at row %d." % row_number
+                )
+            last_times[0] = moment
+            yield row
+
+    in_window = deque()  # Tuples (datetime, codes), oldest first
+    boundary = None
+    changed = False
+
+    def expire(boundary):
+        """
+        :return: Boolean, whether rows left the window ending at `boundary`
+        """
+        expired = False
+        while window is not None and in_window \
+                and in_window[0][0] < boundary - window:
+            live_tally.add_codes(in_window.popleft()[1], -1)
+            expired = True
+        return expired
+
+    for codes in encode_judgments(
+            read_times(judgments_data), len(candidates_list), mentions,
+            skip_cols, validation=validation):
+        moment = last_times[0]
+        if boundary is None:
+            boundary = get_boundary_after(moment)
+
+        while boundary <= moment:
+            if expire(boundary) or changed:
+                yield boundary, live_tally.get_ranking(), \
+                    live_tally.get_tallies()
+                changed = False
+            # Jump over the boundaries where nothing would change.
+            next_boundary = get_boundary_after(moment)
+            if in_window:
+                next_boundary = min(
+                    next_boundary,
+                    get_boundary_after(in_window[0][0] + window)
+                )
+            boundary = next_boundary
+
+        live_tally.add_codes(codes)
+        if window is not None:
+            in_window.append((moment, codes))
+        changed = True
+
+    if boundary is not None and (expire(boundary) or changed):
+        yield boundary, live_tally.get_ranking(), live_tally.get_tallies()
+
+
+def tally_judgments_data(judgments_data,
+                         mentions,
+                         skip_cols=0,
+                         liquid=False,
+                         jobs=1,
+                         profile=None,
+                         validation=None,
+                         aggregated=False,
+                         checkpoint_filename=None,
+                         resume=False,
+                         checkpoint_interval=CHECKPOINT_INTERVAL,
+                         candidates=None):
+    """
+    Count the judgments with the fastest way available for their kind.
+    See `deliberate` for the parameters.
+
+    :return: Tuple (List of candidates, numpy array candidates × mentions)
+    """
+    if isinstance(judgments_data, JudgmentsStore):
+        if list(mentions) != judgments_data.mentions:
+            raise ValueError("The store %s was made with other mentions." % (
+                judgments_data.filename
+            ))
+        return tally_judgments_store(judgments_data, candidates)
+
+    if isinstance(judgments_data, dict):
+        return project_tally(*tally_aggregated_judgments(
+            judgments_data, mentions, validation
+        ), candidates=candidates)
+
+    if is_file(judgments_data):
+        judgments_data = decompress_judgments_file(judgments_data)
+
+    if checkpoint_filename is not None:
+        if aggregated or liquid or get_plain_filename(judgments_data) is None:
+            raise ValueError(
+                "Only the judges of uncompressed CSV files are checkpointed."
+            )
+        return tally_judgments_with_checkpoints(
+            judgments_data.name, mentions, checkpoint_filename, skip_cols,
+            resume, checkpoint_interval,
+            getattr(judgments_data, 'encoding', None) or 'utf-8',
+            validation, candidates
+        )
+
+    # Compressed files are read from their start only, by a single process.
+    if jobs > 1 and not aggregated and not liquid \
+            and get_plain_filename(judgments_data) is not None:
+        return tally_judgments_in_parallel(
+            judgments_data.name, mentions, skip_cols, jobs,
+            getattr(judgments_data, 'encoding', None) or 'utf-8',
+            validation, candidates
+        )
+
+    if is_string(judgments_data):
+        judgments_data = StringIO(judgments_data.strip())
+
+    if is_file(judgments_data):
+        judgments_data = load_judgments_from_file(judgments_data)
+
+    # Rows of counts and delegations are read whole, and projected once tallied.
+    if aggregated:
+        return project_tally(*tally_aggregated_judgments(
+            judgments_data, mentions, validation
+        ), candidates=candidates)
+
+    if liquid:
+        return project_tally(*tally_liquid_judgments(
+            judgments_data, mentions, skip_cols, validation
+        ), candidates=candidates)
+
+    return tally_judgments(
+        judgments_data, mentions, skip_cols, profile, validation, candidates
+    )
+
+
+def deliberate(judgments_data,
+               mentions,
+               skip_cols=0,
+               liquid=False,
+               jobs=1,
+               cache_dir=None,
+               cache_size=TALLY_CACHE_SIZE,
+               profile=None,
+               top_k=None,
+               validation=None,
+               aggregated=False,
+               tally_filename=None,
+               checkpoint_filename=None,
+               resume=False,
+               checkpoint_interval=CHECKPOINT_INTERVAL,
+               algorithm=DEFAULT_ALGORITHM,
+               candidates=None):
+    """
+    :param judgments_data: String (CSV), file object (CSV, read lazily),
+                           JudgmentsStore or Iterable of rows, candidates first.
+                           Dict of tallies, candidate => mention => int.
+    :param mentions: String (one per line) or List, highest to lowest.
+                     May be None for a JudgmentsStore, to use its own.
+    :param skip_cols: Amount of columns to skip on the left
+    :param liquid: Boolean, judges are named and may delegate.
+                   See `tally_liquid_judgments`.
+    :param jobs: Amount of processes tallying a CSV file, when judgments_data
+                 is a file object of a regular file and the poll isn't liquid.
+    :param cache_dir: String, directory where to cache the tallies of files,
+                      None to disable the cache.  See `get_tally_cache_key`.
+    :param cache_size: Maximum size of the cache directory, in bytes
+    :param profile: Profile, measuring the phases of the deliberation
+    :param top_k: Integer, only rank the `top_k` best candidates
+    :param validation: Validation, what to do with unknown mentions, and
+                       where they were found.  None to raise an
+                       InvalidJudgmentsError.  Tallies are not cached with
+                       other policies than `fail`, to always report them.
+    :param aggregated: Boolean, the rows are `candidate,mention,count`
+                       instead of ballots.  See `tally_aggregated_judgments`.
+    :param tally_filename: String, path where to save the tallies, to merge
+                           them with others later.  See `merge_tally_files`.
+    :param checkpoint_filename: String, path where to save checkpoints of
+                                the tally of a CSV file, every
+                                `checkpoint_interval` seconds.
+    :param resume: Boolean, resume the tally from the checkpoint.
+                   See `tally_judgments_with_checkpoints`.
+    :param algorithm: String, ranking the candidates, one of the ALGORITHMS
+    :param candidates: List, only deliberate these candidates, whose
+                       columns are found once in the header.  The judgments
+                       of the other ones are neither validated nor counted.
+                       None for all the candidates.
+    :return: Tuple (List of candidates best first, Dict of tallies)
+    """
+
+    if is_string(mentions):
+        mentions = load_mentions_from_string(mentions)
+
+    if isinstance(judgments_data, JudgmentsStore) and mentions is None:
+        mentions = judgments_data.mentions
+
+    cache_key = None
+    cached = None
+    if cache_dir and not aggregated and is_file(judgments_data) \
+            and os.path.isfile(getattr(judgments_data, 'name', '')) \
+            and (validation is None
+                 or validation.on_unknown_mention == 'fail'):
+        with profile_phase(profile, 'cache'):
+            cache_key = get_tally_cache_key(
+                judgments_data.name, mentions, skip_cols, liquid, candidates
+            )
+            cached = load_cached_tally(cache_dir, cache_key)
+
+    if cached is not None:
+        candidates_list, tally_matrix = cached
+    else:
+        with profile_phase(profile, 'tally'):
+            candidates_list, tally_matrix = tally_judgments_data(
+                judgments_data, mentions, skip_cols, liquid, jobs, profile,
+                validation, aggregated,
+                checkpoint_filename, resume, checkpoint_interval, candidates
+            )
+
+    if cache_key is not None and cached is None:
+        with profile_phase(profile, 'cache'):
+            save_cached_tally(
+                cache_dir, cache_key,
+                candidates_list, mentions, tally_matrix,
+                cache_size
+            )
+
+    if tally_filename is not None:
+        save_tally_file(tally_filename, candidates_list, mentions, tally_matrix)
+
+    # log("Candidates")
+    # log(candidates_list)
+    # log(tally_matrix)
+
+    judgments_tallies = get_tallies_from_matrix(
+        tally_matrix, candidates_list, mentions
+    )
+
+    with profile_phase(profile, 'sort'):
+        sorted_candidates = sort_candidates(
+            judgments_tallies,
+            candidates_list,
+            mentions,
+            profile=profile,
+            top_k=top_k,
+            algorithm=algorithm)
+
+    return sorted_candidates, judgments_tallies
+
+
+def get_majority_judgment_keys(tally_matrix):
+    """
+    :param tally_matrix: List of Lists or numpy array candidates × mentions
+    :return: List of majority values, see `get_majority_value_from_counts`
+    """
+    return [get_majority_value_from_counts(list(c)) for c in tally_matrix]
+
+
+def get_keys_of_scores(get_scores):
+    """
+    :param get_scores: Function, tally matrix => numpy array of scores,
+                       the higher the better
+    :return: Function, tally matrix => List of sort keys, the lower the better.
+             Candidates without judgments come last, like with
+             `get_majority_value_from_counts`.
+    """
+    def get_keys(tally_matrix):
+        import numpy as np
+
+        tally_matrix = np.asarray(tally_matrix)
+        scores = np.where(
+            tally_matrix.sum(axis=-1) > 0, get_scores(tally_matrix), -np.inf
+        )
+        return (-scores).tolist()
+    return get_keys
+
+
+# Algorithms ranking the candidates from their tallies:
+# name => function, tally matrix => List of sort keys, the lower the better.
+# Keys of all the candidates are computed at once, from the counts only.
+ALGORITHMS = OrderedDict([
+    ('majority-judgment', get_majority_judgment_keys),
+    ('typical-judgment', get_keys_of_scores(get_typical_judgment_scores)),
+    ('usual-judgment', get_keys_of_scores(get_usual_judgment_scores)),
+    ('central-judgment', get_keys_of_scores(get_central_judgment_scores)),
+    ('majority-gauge', get_keys_of_scores(get_majority_gauges_from_matrix)),
+])
+
+
+def get_majority_values(judgments_tallies, candidates, mentions,
+                        profile=None, algorithm=DEFAULT_ALGORITHM):
+    """
+    :param judgments_tallies: Dict, candidate => mention => int
+    :param candidates: List
+    :param mentions: List, highest to lowest
+    :param profile: Profile, counting the `majority_values` computed
+    :param algorithm: String, one of the ALGORITHMS
+    :return: Dict, candidate => sort key, see `get_majority_value`
+             for the majority judgment
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError("Unknown algorithm `%s', pick one of %s." % (
+            algorithm, ", ".join(ALGORITHMS)
+        ))
+
+    # Each key is computed once, instead of once per comparison.
+    majority_values = dict()
+    if candidates:
+        majority_values = dict(zip(candidates, ALGORITHMS[algorithm]([
+            [judgments_tallies[candidate][m] for m in mentions]
+            for candidate in candidates
+        ])))
+
+    if profile is not None:
+        profile.count('majority_values', len(majority_values))
+
+    return majority_values
+
+
+def sort_by_majority_values(candidates, majority_values, top_k=None):
+    """
+    :param majority_values: Dict, candidate => sort key
+    :param top_k: Integer, only rank the `top_k` best candidates, with a heap
+                  instead of sorting them all.  None to rank them all.
+    :return: List of candidates, best first, tied ones in the given order
+    """
+    if top_k is not None and top_k < len(candidates):
+        # Same order as the sort, ties included, in O(n log k).
+        return heapq.nsmallest(
+            top_k,
+            candidates,
+            key=lambda candidate: majority_values[candidate]
+        )
+
+    return sorted(
+        candidates,
+        key=lambda candidate: majority_values[candidate]
+    )
+
+
+def group_tied_candidates(sorted_candidates, majority_values):
+    """
+    :param sorted_candidates: List, best first
+    :param majority_values: Dict, candidate => sort key
+    :return: List of Lists of candidates in exact equality, best first
+    """
+    groups = []
+    previous = None
+    for candidate in sorted_candidates:
+        majority_value = majority_values[candidate]
+        if groups and majority_value == previous:
+            groups[-1].append(candidate)
+        else:
+            groups.append([candidate])
+        previous = majority_value
+    return groups
+
+
+def sort_candidates(judgments_tallies, candidates, mentions, profile=None,
+                    top_k=None, algorithm=DEFAULT_ALGORITHM):
+    """
+    :param judgments_tallies: Dict, candidate => mention => int
+    :param candidates: List
+    :param mentions: List, highest to lowest
+    :param profile: Profile, counting the `majority_values` computed
+    :param top_k: Integer, only rank the `top_k` best candidates, with a heap
+                  instead of sorting them all.  None to rank them all.
+    :param algorithm: String, one of the ALGORITHMS
+    :return: List of candidates, best first
+    """
+    return sort_by_majority_values(
+        candidates,
+        get_majority_values(
+            judgments_tallies, candidates, mentions, profile, algorithm
+        ),
+        top_k
+    )
+
+
+def rank_candidates(judgments_tallies, candidates, mentions, profile=None,
+                    top_k=None, algorithm=DEFAULT_ALGORITHM):
+    """
+    Like `sort_candidates`, with the candidates in exact equality grouped.
+
+    :param top_k: Integer, only rank the `top_k` best candidates.  Candidates
+                  tied with the last ones may be left out.
+    :return: List of Lists of tied candidates, best first
+    """
+    majority_values = get_majority_values(
+        judgments_tallies, candidates, mentions, profile, algorithm
+    )
+    return group_tied_candidates(
+        sort_by_majority_values(candidates, majority_values, top_k),
+        majority_values
+    )
+
+
+class LiveTally(object):
+    """
+    Tallies of a poll updated ballot by ballot, with a ranking that is only
+    sorted again when queried after some ballots.  As blank judgments count,
+    a ballot changes the majority values of all the candidates.
+
+    Blank or missing judgments are the lowest mention, like in `deliberate`.
+    """
+
+    def __init__(self, candidates, mentions, tally_matrix=None):
+        """
+        :param candidates: List
+        :param mentions: List, highest to lowest
+        :param tally_matrix: numpy array candidates × mentions, to start from
+        """
+        self.candidates = list(candidates)
+        self.mentions = list(mentions)
+        self.candidates_indices = get_positions(self.candidates)
+        self.mentions_codes = get_positions(self.mentions)
+        if tally_matrix is None:
+            self.counts = [[0] * len(self.mentions) for _ in self.candidates]
+        else:
+            self.counts = tally_matrix.tolist()
+        self.judges = sum(self.counts[0]) if self.counts else 0
+        self.ordering = []  # sorted Tuples (majority value, index)
+        self.dirty = True  # ballots were counted since the last sort
+
+    def encode_ballot(self, ballot):
+        """
+        :param ballot: List of mentions in the order of the candidates,
+                       or Dict, candidate => mention
+        :return: List of mentions positions, one per candidate
+        """
+        blank_code = len(self.mentions) - 1
+        if isinstance(ballot, dict):
+            judgments = [None] * len(self.candidates)
+            for candidate, mention in ballot.items():
+                index = self.candidates_indices.get(candidate)
+                if index is None:
+                    raise ValueError("Unknown candidate `%s'." % candidate)
+                judgments[index] = mention
+        else:
+            judgments = list(ballot)
+            if len(judgments) > len(self.candidates):
+                raise ValueError("%d judgments for %d candidates." % (
+                    len(judgments), len(self.candidates)
+                ))
+            judgments += [None] * (len(self.candidates) - len(judgments))
+
+        codes = []
+        for mention in judgments:
+            if mention is None or mention == '':
+                codes.append(blank_code)
+                continue
+            code = self.mentions_codes.get(mention)
+            if code is None:
+                raise ValueError("Unknown mention `%s'." % mention)
+            codes.append(code)
+        return codes
+
+    def add_ballot(self, ballot):
+        """
+        Count a ballot, or nothing at all if it is invalid.
+
+        :param ballot: See `encode_ballot`
+        """
+        self.add_codes(self.encode_ballot(ballot))
+
+    def add_codes(self, codes, amount=1):
+        """
+        :param codes: List of mentions positions, one per candidate
+        :param amount: Integer, -1 to remove a ballot counted before
+        """
+        for index, code in enumerate(codes):
+            self.counts[index][code] += amount
+        self.dirty = True
+        self.judges += amount
+
+    def refresh(self):
+        """
+        Sort the candidates again, with all the ballots counted so far.
+        """
+        self.ordering = sorted(
+            (get_majority_value_from_counts(counts), index)
+            for index, counts in enumerate(self.counts)
+        )
+        self.dirty = False
+
+    def get_ranking(self, top_k=None):
+        """
+        :param top_k: Integer, only the `top_k` best candidates
+        :return: List of candidates best first, like `sort_candidates`
+        """
+        if self.dirty:
+            self.refresh()
+        return [self.candidates[i] for _, i in self.ordering[:top_k]]
+
+    def get_tallies(self):
+        """
+        :return: Dict, candidate => mention => int
+        """
+        return OrderedDict(
+            (candidate, OrderedDict(zip(self.mentions, counts)))
+            for candidate, counts in zip(self.candidates, self.counts)
+        )
+
+    def get_medians(self):
+        """
+        :return: Dict, candidate => median mention
+        """
+        return OrderedDict(
+            (candidate, get_median(tally, self.mentions))
+            for candidate, tally in self.get_tallies().items()
+        )
+
+
+def draw_merit_profile(axes, judgments_tallies, candidates, mentions):
+    """
+    Draw the merit profiles of the candidates on matplotlib Axes,
+    with one stacked bar per candidate, best at the top.
+
+    :param axes: matplotlib Axes
+    :param candidates: List, best first
+    :param mentions: List, highest to lowest
+    """
+    import numpy as np
+    from matplotlib.collections import LineCollection
+    from matplotlib.patches import Patch
+
+    bar_girth = 0.62
+    candidates = [c for c in reversed(candidates)]  # :(|) oOoK
+    candidates_amount = len(candidates)
+    mentions_amount = len(mentions)
+
+    # For each candidate, how many of each mention
+    tally_matrix = get_matrix_from_tallies(
+        judgments_tallies, candidates, mentions
+    )
+    right_offsets = np.cumsum(tally_matrix, axis=1)
+    left_offsets = right_offsets - tally_matrix
+    judgments_count = int(right_offsets[:, -1].max()) \
+        if candidates_amount and mentions_amount else 0
+
+    colors = [
+        MERIT_PROFILE_COLORS[i % len(MERIT_PROFILE_COLORS)]
+        for i in range(mentions_amount)
+    ]
+
+    # All the segments at once, mention after mention
+    axes.barh(
+        np.repeat(np.arange(candidates_amount), mentions_amount),
+        tally_matrix.ravel(),
+        bar_girth,
+        left=left_offsets.ravel(),
+        color=colors * candidates_amount,
+    )
+
+    # White separators between colors
+    ind = np.arange(candidates_amount)
+    separators = [
+        [(offset, j - 0.5), (offset, j + 0.5)]
+        for j, offsets in enumerate(left_offsets[:, 1:].tolist())
+        for offset in offsets
+    ]
+    axes.add_collection(LineCollection(
+        separators,
+        colors=((1, 1, 1, 1),),
+        linewidths=2,
+    ))
+
+    axes.set_title('Merit Profiles')
+    axes.set_ylabel('Candidates')
+    axes.set_yticks(ind)
+    axes.set_yticklabels(candidates)
+    axes.set_xlabel('Mentions given')
+    axes.set_xticks([judgments_count])
+    axes.set_xticklabels([judgments_count])
+
+    axes.legend(
+        [Patch(color=color) for color in colors], mentions,
+        ncol=max(1, mentions_amount),
+        loc='upper center',
+        prop={'size': 6},
+        fancybox=True,
+        shadow=True,
+        bbox_to_anchor=(0.5, -0.15),
+    )
+
+    axes.axvline(x=judgments_count * 0.5, linestyle='--')
+
+
+def get_hex_color(color):
+    """
+    :param color: Tuple (red, green, blue, alpha), from 0 to 1
+    :return: String, like `#007d3d`
+    """
+    return "#%02x%02x%02x" % tuple(int(round(c * 255)) for c in color[:3])
+
+
+def write_merit_profile_svg(judgments_tallies, candidates, mentions,
+                            svg_file, width=640):
+    """
+    Write the merit profiles of the candidates as SVG, with the layout of
+    `plot_merit_profile`, without any plotting library.
+
+    :param candidates: List, best first
+    :param mentions: List, highest to lowest
+    :param svg_file: File object, written as the bars are computed
+    :param width: Integer, of the image in pixels
+    """
+    row_height = 40
+    bar_girth = 0.62
+    left = 20 + 7 * max([len(c) for c in candidates] + [4])
+    top = 40
+    plot_width = width - left - 20
+    plot_height = row_height * max(1, len(candidates))
+    bottom = top + plot_height
+    height = bottom + 80
+    judgments_count = max(
+        [sum(judgments_tallies[c][m] for m in mentions) for c in candidates]
+        + [0]
+    )
+    scale = float(plot_width) / (judgments_count or 1)
+    colors = [
+        get_hex_color(MERIT_PROFILE_COLORS[i % len(MERIT_PROFILE_COLORS)])
+        for i in range(len(mentions))
+    ]
+
+    write = svg_file.write
+    write('<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" '
+          'font-family="sans-serif" font-size="12">\n' % (width, height))
+    write('<rect width="100%" height="100%" fill="white"/>\n')
+    write('<text x="%.1f" y="24" font-size="14" text-anchor="middle">'
+          'Merit Profiles</text>\n' % (left + plot_width / 2.0))
+    write('<text transform="translate(12,%.1f) rotate(-90)" '
+          'text-anchor="middle">Candidates</text>\n' % (top + plot_height / 2.0))
+
+    for i, candidate in enumerate(candidates):
+        y = top + row_height * (i + (1 - bar_girth) / 2.0)
+        write('<text x="%d" y="%.1f" text-anchor="end" '
+              'dominant-baseline="middle">%s</text>\n' % (
+                  left - 6, top + row_height * (i + 0.5), escape(candidate)
+              ))
+        offset = 0
+        for mention, color in zip(mentions, colors):
+            count = judgments_tallies[candidate][mention]
+            if count:
+                write('<rect x="%.2f" y="%.1f" width="%.2f" height="%.1f" '
+                      'fill="%s"/>\n' % (
+                          left + offset * scale, y, count * scale,
+                          row_height * bar_girth, color
+                      ))
+            if offset:
+                write('<line x1="%.2f" y1="%.1f" x2="%.2f" y2="%.1f" '
+                      'stroke="white" stroke-width="2"/>\n' % (
+                          left + offset * scale, y,
+                          left + offset * scale, y + row_height * bar_girth
+                      ))
+            offset += count
+
+    write('<line x1="%.1f" y1="%d" x2="%.1f" y2="%d" stroke="#1f77b4" '
+          'stroke-width="1.5" stroke-dasharray="5,3"/>\n' % (
+              left + plot_width / 2.0, top, left + plot_width / 2.0, bottom
+          ))
+    write('<rect x="%d" y="%d" width="%d" height="%d" fill="none" '
+          'stroke="black"/>\n' % (left, top, plot_width, plot_height))
+    write('<text x="%d" y="%d" text-anchor="middle">%d</text>\n' % (
+        left + plot_width, bottom + 16, judgments_count
+    ))
+    write('<text x="%.1f" y="%d" text-anchor="middle">Mentions given</text>\n'
+          % (left + plot_width / 2.0, bottom + 34))
+
+    x = left
+    for mention, color in zip(mentions, colors):
+        write('<rect x="%d" y="%d" width="14" height="8" fill="%s"/>\n' % (
+            x, bottom + 52, color
+        ))
+        write('<text x="%d" y="%d" font-size="9">%s</text>\n' % (
+            x + 18, bottom + 60, escape(mention)
+        ))
+        x += 30 + 6 * len(mention)
+
+    write('</svg>\n')
+
+
+def write_merit_profile_text(judgments_tallies, candidates, mentions,
+                             text_file, width=60, ansi=False):
+    """
+    Write the merit profiles of the candidates as text, one line per bar,
+    with the median marked by a `|`.
+
+    :param candidates: List, best first
+    :param mentions: List, highest to lowest
+    :param text_file: File object
+    :param width: Integer, of the bars in characters
+    :param ansi: Boolean, color the bars with ANSI escape codes
+                 instead of a symbol per mention
+    """
+    label_width = max([len(c) for c in candidates] + [0])
+    styles = []
+    for i in range(len(mentions)):
+        if ansi:
+            color = MERIT_PROFILE_COLORS[i % len(MERIT_PROFILE_COLORS)]
+            styles.append("\x1b[48;2;%d;%d;%dm" % tuple(
+                int(round(c * 255)) for c in color[:3]
+            ))
+        else:
+            styles.append(MERIT_PROFILE_SYMBOLS[i % len(MERIT_PROFILE_SYMBOLS)])
+
+    for candidate in candidates:
+        counts = [judgments_tallies[candidate][m] for m in mentions]
+        total = sum(counts) or 1
+        cells = []
+        offset = 0
+        for count, style in zip(counts, styles):
+            # Cells by rounded cumulative offsets, so the bar is `width` long
+            start = offset * width // total
+            offset += count
+            cells.extend([style] * (offset * width // total - start))
+        line = ""
+        previous = None
+        for i, style in enumerate(cells):
+            if ansi and style != previous:
+                line += style  # the escape code, when the color changes
+                previous = style
+            line += '|' if i == width // 2 else (' ' if ansi else style)
+        text_file.write("%s %s%s\n" % (
+            candidate.rjust(label_width), line, "\x1b[0m" if ansi else ""
+        ))
+
+    legend = []
+    for mention, style in zip(mentions, styles):
+        legend.append(
+            ("%s \x1b[0m %s" % (style, mention)) if ansi
+            else ("%s %s" % (style, mention))
+        )
+    text_file.write("%s %s\n" % (" " * label_width, "  ".join(legend)))
+
+
+def plot_merit_profile(judgments_tallies, candidates, mentions, filename=None,
+                       dpi=MERIT_PROFILE_DPI, figure=None):
+    """
+    Plot the merit profiles of the candidates, in a file or on screen.
+
+    Files are rendered headless, without pyplot nor its global state.
+
+    :param filename: String, should match `*.png`, `*.pdf` or `*.svg`.
+                     Paths are allowed.  SVG files are written without
+                     matplotlib, see `write_merit_profile_svg`.
+                     None to show the plot on screen, with pyplot.
+    :param dpi: Integer, resolution of the file
+    :param figure: matplotlib Figure, to reuse between files.  It is cleared.
+    """
+    # The plotting stack is slow to import, only load it when plotting.
+    if filename is None:
+        import matplotlib.pyplot as plt
+
+        draw_merit_profile(plt.gca(), judgments_tallies, candidates, mentions)
+        mng = plt.get_current_fig_manager()
+        mng.full_screen_toggle()
+        plt.show()
+        plt.clf()
+        return
+
+    if filename.lower().endswith('.svg'):
+        with open(filename, 'w') as svg_file:
+            write_merit_profile_svg(
+                judgments_tallies, candidates, mentions, svg_file
+            )
+        return
+
+    if figure is None:
+        from matplotlib.figure import Figure
+        figure = Figure()
+    else:
+        figure.clear()
+
+    draw_merit_profile(
+        figure.add_subplot(), judgments_tallies, candidates, mentions
+    )
+    figure.savefig(filename, dpi=dpi, bbox_inches='tight')
+
+
+def plot_merit_profiles_chunk(plots, dpi=MERIT_PROFILE_DPI):
+    """
+    Plot merit profiles in files, on a single reused Figure.
+
+    :param plots: List of Tuples (filename, tallies, candidates, mentions)
+    """
+    from matplotlib.figure import Figure
+
+    figure = Figure()
+    for filename, judgments_tallies, candidates, mentions in plots:
+        plot_merit_profile(
+            judgments_tallies, candidates, mentions, filename, dpi, figure
+        )
+
+
+def plot_merit_profiles(plots, dpi=MERIT_PROFILE_DPI, jobs=1):
+    """
+    Plot many merit profiles in files, in `jobs` processes.
+
+    :param plots: List of Tuples (filename, tallies, candidates, mentions)
+    :param dpi: Integer, resolution of the files
+    """
+    plots = list(plots)
+    jobs = min(jobs, len(plots))
+    if jobs <= 1:
+        plot_merit_profiles_chunk(plots, dpi)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(plot_merit_profiles_chunk, plots[i::jobs], dpi)
+            for i in range(jobs)
+        ]
+        for future in futures:
+            future.result()
+
+
+def find_polls(paths, manifest=None):
+    """
+    :param paths: List of directories (their CSV files), globs or files
+    :param manifest: File object listing the polls, one path per line
+    :return: List of paths of poll files, in the given order
+    """
+    polls = []
+    for path in paths:
+        if os.path.isdir(path):
+            polls.extend(sorted(glob.glob(os.path.join(path, '*.csv'))))
+        elif glob.has_magic(path):
+            polls.extend(sorted(glob.glob(path)))
+        else:
+            polls.append(path)
+
+    if manifest is not None:
+        folder = os.path.dirname(getattr(manifest, 'name', ''))
+        for line in manifest:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                polls.append(os.path.join(folder, line))
+
+    return polls
+
+
+def deliberate_poll(filename, mentions, skip_cols=0,
+                    on_unknown_mention='fail'):
+    """
+    Deliberate one poll of a batch.  Its failure is reported as its result,
+    and does not stop the other polls.  Logs are written on stderr.
+
+    :param filename: String, path of a CSV file or of a binary store
+    :param mentions: List, highest to lowest
+    :param on_unknown_mention: String, policy of the `Validation`
+    :return: OrderedDict, the `poll` with its `ranking`, `medians` and
+             `tallies`, or the `poll` with an `error`.  Both may have the
+             `unknown_mentions` found, as Lists [row, column, mention].
+    """
+    result = OrderedDict(poll=filename)
+    validation = Validation(on_unknown_mention)
+    try:
+        with redirect_stdout(sys.stderr):
+            if is_judgments_store(filename):
+                deliberation, tally = deliberate(
+                    load_judgments_store(filename), mentions
+                )
+            else:
+                with open(filename) as judgments_file:
+                    deliberation, tally = deliberate(
+                        judgments_file, mentions, skip_cols,
+                        validation=validation
+                    )
+    except InvalidJudgmentsError as e:
+        result['error'] = str(e)
+        result['unknown_mentions'] = [list(error) for error in e.errors]
+        return result
+    except Exception as e:
+        result['error'] = "%s: %s" % (type(e).__name__, e)
+        return result
+
+    result['ranking'] = deliberation
+    result['medians'] = OrderedDict(
+        (candidate, get_median(tally[candidate], mentions))
+        for candidate in deliberation
+    )
+    result['tallies'] = OrderedDict(
+        (candidate, OrderedDict((m, tally[candidate][m]) for m in mentions))
+        for candidate in deliberation
+    )
+    if validation.errors:
+        result['unknown_mentions'] = [
+            list(error) for error in validation.errors
+        ]
+    return result
+
+
+def deliberate_polls(filenames, mentions, skip_cols=0, jobs=1,
+                     on_unknown_mention='fail'):
+    """
+    Deliberate many polls sharing the same mentions, in `jobs` processes.
+
+    :param filenames: List of paths, see `find_polls`
+    :param mentions: List, highest to lowest
+    :param on_unknown_mention: String, policy of the `Validation`
+    :return: Generator of results of `deliberate_poll`, in the given order
+    """
+    if jobs <= 1 or len(filenames) <= 1:
+        for filename in filenames:
+            yield deliberate_poll(
+                filename, mentions, skip_cols, on_unknown_mention
+            )
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for result in executor.map(
+                deliberate_poll,
+                filenames, repeat(mentions), repeat(skip_cols),
+                repeat(on_unknown_mention),
+                chunksize=max(1, len(filenames) // (jobs * 4))):
+            yield result
+
+
+def answer_ballots_line(live_tally, line):
+    """
+    Handle a line of the protocol of `start_ballots_server`.
+
+    Ballots are CSV lines of mentions in the order of the candidates,
+    JSON lists of mentions, or JSON objects candidate => mention.
+    Queries are `?ranking`, `?ranking K` for the K best, `?medians`
+    and `?tallies`.
+
+    :param live_tally: LiveTally
+    :param line: String, without the line ending
+    :return: Dict, the answer, with an `error` if the line is invalid
+    """
+    try:
+        if line.startswith('?'):
+            query = line[1:].split()
+            if query and query[0] == 'ranking' and len(query) <= 2:
+                top_k = int(query[1]) if len(query) == 2 else None
+                return OrderedDict([
+                    ('ranking', live_tally.get_ranking(top_k)),
+                    ('judges', live_tally.judges),
+                ])
+            if query == ['medians']:
+                return OrderedDict([
+                    ('medians', live_tally.get_medians()),
+                    ('judges', live_tally.judges),
+                ])
+            if query == ['tallies']:
+                return OrderedDict([
+                    ('tallies', live_tally.get_tallies()),
+                    ('judges', live_tally.judges),
+                ])
+            raise ValueError("Unknown query `%s'." % line)
+
+        if line.startswith('{') or line.startswith('['):
+            ballot = json.loads(line)
+        else:
+            ballot = next(csv.reader([line]))
+        live_tally.add_ballot(ballot)
+    except (ValueError, TypeError) as e:
+        return OrderedDict(error=str(e))
+
+    return OrderedDict(judges=live_tally.judges)
+
+
+async def start_ballots_server(live_tally, host='127.0.0.1', port=0,
+                               socket_path=None):
+    """
+    Listen for ballots and queries, one per line, and answer each line
+    with a JSON line.  See `answer_ballots_line`.
+
+    :param live_tally: LiveTally, updated by the ballots
+    :param socket_path: String, path of a Unix socket to listen on
+                        instead of the host and port
+    :return: asyncio Server
+    """
+    import asyncio
+
+    async def handle_client(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode('utf-8').strip()
+                if not line:
+                    continue
+                answer = answer_ballots_line(live_tally, line)
+                writer.write(
+                    (json.dumps(answer, ensure_ascii=False) + "\n")
+                    .encode('utf-8')
+                )
+                await writer.drain()
+        except (ConnectionError, UnicodeDecodeError):
+            pass
+        finally:
+            writer.close()
+
+    if socket_path is not None:
+        return await asyncio.start_unix_server(handle_client, socket_path)
+    return await asyncio.start_server(handle_client, host, port)
+
+
+def load_mentions_file(mentions_file=None):
+    """
+    :param mentions_file: String, path to a file with one mention per line
+    :return: List of mentions, highest to lowest, DEFAULT_MENTIONS if no file
+    """
+    if not mentions_file:
+        return list(DEFAULT_MENTIONS)
+    with open(mentions_file) as f:
+        return [l.strip() for l in f.readlines() if l and l.strip()]
+
+
+def load_candidates_option(candidates):
+    """
+    :param candidates: String, path to a file with one candidate per line,
+                       or the candidates themselves, comma-separated
+    :return: List of candidates, None if none were given
+    """
+    if not candidates:
+        return None
+    if os.path.isfile(candidates):
+        with open(candidates) as f:
+            return [l.strip() for l in f.readlines() if l and l.strip()]
+    return [c.strip() for c in next(csv.reader([candidates])) if c.strip()]
+
+
+def log_unknown_mentions(validation):
+    if validation.errors_amount:
+        log(validation.format_errors())
+        log("%s %d unknown mention(s)." % (
+            "Skipped the rows of" if validation.on_unknown_mention == 'skip'
+            else "Counted as blank",
+            validation.errors_amount
+        ))
+
+
+def log_deliberation(deliberation, tally, mentions, title="DELIBERATION",
+                     algorithm=DEFAULT_ALGORITHM):
+    tied_groups = group_tied_candidates(
+        deliberation,
+        get_majority_values(tally, deliberation, mentions, algorithm=algorithm)
+    )
+
+    log("\n" + title)
+    rank = 1
+    for group in tied_groups:
+        for candidate in group:
+            log("%02d.\t%18s\t%s" % (
+                rank,
+                get_median(tally[candidate], mentions),
+                candidate,
+            ))
+        rank += len(group)
+
+    for group in tied_groups:
+        if len(group) > 1:
+            log("\nEXACT EQUALITY FOUND FOR CANDIDATES")
+            log(" == ".join(group))
+
+
+def convert_main(args_parser, args):
+    log("Converting the judgments of %s into %s..." % (
+        args.input_file, args.store_file
+    ))
+
+    try:
+        judgments_file = open_judgments_file(args.input_file)
+    except OSError as e:
+        args_parser.error("can't open '%s': %s" % (args.input_file, e))
+    if isinstance(judgments_file, JudgmentsStore):
+        args_parser.error("%s is already a store." % args.input_file)
+
+    validation = Validation(args.on_unknown_mention)
+    try:
+        store = convert_judgments_to_store(
+            load_judgments_from_file(judgments_file),
+            args.store_file,
+            load_mentions_file(args.mentions_file),
+            int(args.skip_cols),
+            validation
+        )
+    except InvalidJudgmentsError:
+        log(validation.format_errors())
+        log("Use --mentions to specify a mentions file.")
+        sys.exit(1)
+    log_unknown_mentions(validation)
+
+    log("Wrote the judgments of %d judges on %d candidates." % (
+        store.judges, len(store.candidates)
+    ))
+
+
+def add_judgments_arguments(parser, on_unknown_mention=True):
+    """
+    Add the arguments reading the judgments, shared by the commands.
+
+    :param parser: argparse.ArgumentParser
+    :param on_unknown_mention: Boolean, add the policy of unknown mentions
+    """
+    parser.add_argument(
+        "-m",
+        "--mentions",
+        action="store",
+        dest="mentions_file",
+        help="""
+        A text file with one mention per line,
+        in order from highest to lowest.
+        """
+    )
+
+    parser.add_argument(
+        "--skip-cols",
+        action="store",
+        default=0,
+        dest="skip_cols",
+        help="Amount of columns to skip on the left."
+    )
+
+    if on_unknown_mention:
+        parser.add_argument(
+            "--on-unknown-mention",
+            choices=UNKNOWN_MENTION_POLICIES,
+            default="fail",
+            dest="on_unknown_mention",
+            help="""
+            Fail once all the judgments are read, count the unknown
+            mentions as blank judgments, or skip their rows.
+            """
+        )
+
+
+def get_convert_args_parser():
+    parser = argparse.ArgumentParser(
+        prog='limaju.py convert',
+        description="""
+        Convert a CSV file of judgments into a binary store,
+        way faster to deliberate.
+        """
+    )
+
+    parser.add_argument(
+        'input_file',
+        help="A CSV file with the judgments, compressed or not, "
+             "or - for stdin.",
+    )
+
+    parser.add_argument(
+        'store_file',
+        help="The binary store to write.",
+    )
+
+    add_judgments_arguments(parser)
+
+    return parser
+
+
+def batch_main(args_parser, args):
+    polls = find_polls(args.polls, args.manifest)
+    if not polls:
+        args_parser.error("No polls found.")
+
+    mentions = load_mentions_file(args.mentions_file)
+
+    failures = 0
+    plots = []
+    for result in deliberate_polls(
+            polls, mentions, int(args.skip_cols), args.jobs,
+            args.on_unknown_mention):
+        failures += 'error' in result
+        args.output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        args.output.flush()
+        if args.plots_dir and 'error' not in result:
+            plots.append((
+                os.path.join(args.plots_dir, "%s.%s" % (
+                    os.path.splitext(os.path.basename(result['poll']))[0],
+                    args.plots_format
+                )),
+                result['tallies'], result['ranking'], mentions
+            ))
+
+    if plots:
+        if not os.path.isdir(args.plots_dir):
+            os.makedirs(args.plots_dir)
+        plot_merit_profiles(plots, args.dpi, args.jobs)
+
+    if failures:
+        sys.stderr.write("%d of %d polls failed.\n" % (failures, len(polls)))
+        sys.exit(1)
+
+
+def get_batch_args_parser():
+    parser = argparse.ArgumentParser(
+        prog='limaju.py batch',
+        description="""
+        Deliberate many polls sharing the same mentions,
+        and write the results as JSON lines, one per poll.
+        """
+    )
+
+    parser.add_argument(
+        'polls',
+        nargs='*',
+        help="Directories of CSV files, globs, CSV files or binary stores.",
+    )
+
+    parser.add_argument(
+        "--manifest",
+        type=argparse.FileType('r'),
+        dest="manifest",
+        help="""
+        A text file with the path of a poll per line,
+        relative to the manifest.
+        """
+    )
+
+    add_judgments_arguments(parser)
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        default=1,
+        type=int,
+        dest="jobs",
+        help="Amount of processes deliberating the polls."
+    )
+
+    parser.add_argument(
+        "--plots",
+        action="store",
+        dest="plots_dir",
+        help="Directory where to plot the merit profiles of the polls.",
+        metavar="DIR"
+    )
+
+    parser.add_argument(
+        "--dpi",
+        action="store",
+        default=MERIT_PROFILE_DPI,
+        type=int,
+        dest="dpi",
+        help="Resolution of the plots."
+    )
+
+    parser.add_argument(
+        "--plots-format",
+        choices=["png", "pdf", "svg"],
+        default="png",
+        dest="plots_format",
+        help="Format of the plots, SVG does not need matplotlib."
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=argparse.FileType('w'),
+        default=sys.stdout,
+        help="Where to write the results, as JSON lines."
+    )
+
+    return parser
+
+
+def serve_main(args_parser, args):
+    import asyncio
+
+    if (args.input_file is None) == (args.header is None):
+        args_parser.error("Give either an input file or a --header.")
+
+    mentions = load_mentions_file(args.mentions_file)
+
+    if args.input_file is not None:
+        try:
+            judgments_data = open_judgments_file(args.input_file)
+        except OSError as e:
+            args_parser.error("can't open '%s': %s" % (args.input_file, e))
+        candidates, tally_matrix = tally_judgments_data(
+            judgments_data, mentions, int(args.skip_cols)
+        )
+    else:
+        candidates = [c.strip() for c in next(csv.reader([args.header]))]
+        tally_matrix = None
+
+    live_tally = LiveTally(candidates, mentions, tally_matrix)
+
+    # No `asyncio.run` nor `serve_forever`, which need Python 3.7.
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = loop.run_until_complete(start_ballots_server(
+        live_tally, args.host, args.port, args.socket_path
+    ))
+    log("Serving the ballots of %d candidates on %s..." % (
+        len(candidates),
+        args.socket_path or "%s:%d" % server.sockets[0].getsockname()[:2]
+    ))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        log("Stopped, after %d judges." % live_tally.judges)
+    finally:
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.close()
+
+
+def get_serve_args_parser():
+    parser = argparse.ArgumentParser(
+        prog='limaju.py serve',
+        description="""
+        Receive ballots continuously, one per line as CSV or JSON,
+        and answer `?ranking`, `?medians` and `?tallies` queries.
+        """
+    )
+
+    parser.add_argument(
+        'input_file',
+        nargs='?',
+        help="A CSV file, compressed or not, or a binary store "
+             "with the judgments to start from, or - for stdin.",
+    )
+
+    parser.add_argument(
+        "--header",
+        action="store",
+        dest="header",
+        help="The candidates, comma-separated, to start from no judgments."
+    )
+
+    add_judgments_arguments(parser, on_unknown_mention=False)
+
+    parser.add_argument(
+        "--host",
+        action="store",
+        default="127.0.0.1",
+        dest="host",
+        help="Address to listen on."
+    )
+
+    parser.add_argument(
+        "--port",
+        action="store",
+        default=8421,
+        type=int,
+        dest="port",
+        help="Port to listen on."
+    )
+
+    parser.add_argument(
+        "--socket",
+        action="store",
+        dest="socket_path",
+        help="Path of a Unix socket to listen on, instead of a port."
+    )
+
+    return parser
+
+
+def merge_main(args_parser, args):
+    if args.top is not None and args.top < 1:
+        args_parser.error("--top needs at least one candidate.")
+
+    try:
+        candidates, mentions, tally_matrix = merge_tally_files(
+            args.tally_files
+        )
+    except ValueError as e:
+        args_parser.error(str(e))
+
+    log("Merged the tallies of %d judges from %d files." % (
+        tally_matrix[0].sum() if len(tally_matrix) else 0,
+        len(args.tally_files)
+    ))
+
+    if args.save_tally:
+        save_tally_file(args.save_tally, candidates, mentions, tally_matrix)
+
+    tally = get_tallies_from_matrix(tally_matrix, candidates, mentions)
+    deliberation = sort_candidates(tally, candidates, mentions, top_k=args.top)
+    log_deliberation(deliberation, tally, mentions)
+
+
+def get_merge_args_parser():
+    parser = argparse.ArgumentParser(
+        prog='limaju.py merge',
+        description="""
+        Sum the tallies saved with --save-tally from parts of a poll,
+        and deliberate.
+        """
+    )
+
+    parser.add_argument(
+        'tally_files',
+        nargs='+',
+        help="Tally files of the same poll, with the same mentions.",
+    )
+
+    parser.add_argument(
+        "--save-tally",
+        action="store",
+        dest="save_tally",
+        help="Save the merged tallies, to merge them again later.",
+        metavar="FILE"
+    )
+
+    parser.add_argument(
+        "--top",
+        action="store",
+        default=None,
+        type=int,
+        dest="top",
+        help="Only rank the K best candidates, eg. 1 for the winner.",
+        metavar="K"
+    )
+
+    return parser
+
+
+# Subcommands, eg. `./limaju.py convert`: name => (parser maker, main)
+COMMANDS = {
+    'convert': (get_convert_args_parser, convert_main),
+    'batch': (get_batch_args_parser, batch_main),
+    'serve': (get_serve_args_parser, serve_main),
+    'merge': (get_merge_args_parser, merge_main),
+}
+
+
+def main(args_parser, args):  # move to bottom, no need for a func
+    log("MAJORITY JUDGMENT POLLING -- Version %s" % __version__)
+
+    if args.input_file is None:
+        exit(1)
+
+    if args.top is not None and args.top < 1:
+        args_parser.error("--top needs at least one candidate.")
+
+    if args.bootstrap is not None and args.bootstrap < 1:
+        args_parser.error("--bootstrap needs at least one resampling.")
+
+    if args.resume and not args.checkpoint:
+        args_parser.error("--resume needs a --checkpoint.")
+
+    if args.window and not args.every:
+        args_parser.error("--window needs --every.")
+
+    if args.every:
+        # Rankings over time are made ballot by ballot, see `LiveTally`.
+        for option, given in (
+                ("--candidates", args.candidates),
+                ("--algorithm", args.algorithm != DEFAULT_ALGORITHM),
+                ("--liquid", args.liquid),
+                ("--aggregated", args.aggregated),
+                ("--jobs", args.jobs > 1),
+                ("--save-tally", args.save_tally),
+                ("--checkpoint", args.checkpoint),
+                ("--bootstrap", args.bootstrap),
+                ("--profile", args.profile),
+                ("--text-plot", args.text_plot),
+                ("--plot", args.plot_file)):
+            if given:
+                args_parser.error("%s does not go with --every yet." % option)
+
+    if args.every and args.timestamp_col >= int(args.skip_cols):
+        args_parser.error(
+            "--every needs the --timestamp-col among the --skip-cols, "
+            "eg. --skip-cols %d." % (args.timestamp_col + 1)
+        )
+
+    try:
+        judgments_data = open_judgments_file(args.input_file)
+    except OSError as e:
+        args_parser.error("can't open '%s': %s" % (args.input_file, e))
+
+    if args.mentions_file or not isinstance(judgments_data, JudgmentsStore):
+        mentions = load_mentions_file(args.mentions_file)
+    else:
+        mentions = judgments_data.mentions
+
+    log("\nGoing to use the following mentions:")
+    log(''+(', '.join(mentions)))
+
+    log("\nWaiting for input judgments...")
+    log("(use CTRL+D to exit)")
+
+    profile = Profile() if args.profile else None
+    validation = Validation(args.on_unknown_mention)
+
+    if args.every:
+        try:
+            for end, deliberation, tally in deliberate_over_time(
+                    judgments_data, mentions,
+                    parse_duration(args.every),
+                    parse_duration(args.window) if args.window else None,
+                    int(args.skip_cols),
+                    args.timestamp_col,
+                    args.timestamp_format,
+                    validation):
+                log_deliberation(
+                    deliberation[:args.top], tally, mentions,
+                    "UNTIL %s, %d JUDGES" % (
+                        end, sum(tally[deliberation[0]].values())
+                    ) if deliberation else "UNTIL %s" % end
+                )
+        except InvalidJudgmentsError:
+            log(validation.format_errors())
+            exit(1)
+        except ValueError as e:
+            args_parser.error(str(e))
+        log_unknown_mentions(validation)
+        return
+
+    # The rows are streamed from the file into the tallies.
+    try:
+        deliberation, tally = deliberate(
+            judgments_data, mentions,
+            int(args.skip_cols),
+            liquid=args.liquid,
+            jobs=args.jobs,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            cache_size=args.cache_size * 1024 * 1024,
+            profile=profile,
+            top_k=args.top,
+            validation=validation,
+            aggregated=args.aggregated,
+            tally_filename=args.save_tally,
+            checkpoint_filename=args.checkpoint,
+            resume=args.resume,
+            checkpoint_interval=args.checkpoint_every,
+            algorithm=args.algorithm,
+            candidates=load_candidates_option(args.candidates)
+        )
+    except InvalidJudgmentsError:
+        log(validation.format_errors())
+        log("Use --mentions to specify a mentions file,")
+        log("or --on-unknown-mention to count them as blanks or skip them.")
+        exit(1)
+    except ValueError as e:
+        args_parser.error(str(e))
+    log_unknown_mentions(validation)
+
+    if not deliberation:
+        log("Please provide an input CSV file.")
+        args_parser.print_help()
+        args_parser.exit(1)
+
+    log("\nRead judgments from %d judges." % (
+        sum(tally[deliberation[0]].values())
+    ))
+
+    log_deliberation(deliberation, tally, mentions, algorithm=args.algorithm)
+
+    if args.bootstrap:
+        candidates = deliberation + [c for c in tally if c not in deliberation]
+        rank_counts = bootstrap_ranks(
+            get_matrix_from_tallies(tally, candidates, mentions),
+            args.bootstrap,
+            args.seed
+        )
+
+        log("\nBOOTSTRAP (%% of %d resampled polls at each rank)" % (
+            args.bootstrap
+        ))
+        log("\t" + "".join(
+            "%6s" % ("%02d." % (rank + 1)) for rank in range(len(candidates))
+        ) + "\t")
+        for candidate, counts in zip(candidates, rank_counts.tolist()):
+            log("\t" + "".join(
+                "%6.1f" % (100.0 * count / args.bootstrap) for count in counts
+            ) + "\t" + candidate)
+
+    if args.text_plot:
+        log("\nMERIT PROFILES")
+        write_merit_profile_text(
+            tally, deliberation, mentions, sys.stdout,
+            ansi=sys.stdout.isatty()
+        )
+
+    if args.plot_file:
+        plot_merit_profile(
+            tally, deliberation, mentions, args.plot_file, args.dpi
+        )
+
+    if profile is not None:
+        profile.close()
+        sys.stderr.write(profile.format(args.profile_format) + "\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        get_command_args_parser, command_main = COMMANDS[sys.argv[1]]
+        parser = get_command_args_parser()
+        command_main(parser, parser.parse_args(sys.argv[2:]))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser()
+
+    # Optional argument flag which defaults to False
+    # parser.add_argument(
+    #     '-f',
+    #     '--flag',
+    #     action="store_true",
+    #     default=False,
+    #     help=""
+    # )
+
+    parser.add_argument(
+        'input_file',
+        nargs='?',
+        help="""
+        A CSV file with the judgments, compressed with gzip, bzip2 or xz
+        or not, or a binary store of judgments made by `convert`.
+        Defaults to stdin.
+        """,
+        default='-'
+    )
+
+    add_judgments_arguments(parser)
+
+    parser.add_argument(
+        "--liquid",
+        action="store_true",
+        default=False,
+        dest="liquid",
+        help="""
+        The first column holds the names of the judges,
+        who may delegate a judgment with `@name`.
+        """
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        default=1,
+        type=int,
+        dest="jobs",
+        help="Amount of processes tallying the input file."
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        action="store",
+        default=get_default_cache_dir(),
+        dest="cache_dir",
+        help="Directory where to cache the tallies of the input files."
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        action="store",
+        default=TALLY_CACHE_SIZE // (1024 * 1024),
+        type=int,
+        dest="cache_size",
+        help="Maximum size of the cache, in MiB."
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        dest="no_cache",
+        help="Neither read nor write cached tallies."
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        dest="profile",
+        help="Write the time and memory spent in each phase on stderr."
+    )
+
+    parser.add_argument(
+        "--profile-format",
+        choices=["text", "json"],
+        default="text",
+        dest="profile_format",
+        help="Format of the --profile report."
+    )
+
+    parser.add_argument(
+        "--top",
+        action="store",
+        default=None,
+        type=int,
+        dest="top",
+        help="Only rank the K best candidates, eg. 1 for the winner.",
+        metavar="K"
+    )
+
+    parser.add_argument(
+        "--algorithm",
+        action="store",
+        default=DEFAULT_ALGORITHM,
+        choices=list(ALGORITHMS),
+        dest="algorithm",
+        help="Algorithm ranking the candidates, "
+             "the majority judgment by default."
+    )
+
+    parser.add_argument(
+        "--candidates",
+        action="store",
+        default=None,
+        dest="candidates",
+        help="Only deliberate these candidates, comma-separated, "
+             "or listed one per line in this file.  "
+             "The other columns are neither validated nor counted."
+    )
+
+    parser.add_argument(
+        "--bootstrap",
+        action="store",
+        default=None,
+        type=int,
+        dest="bootstrap",
+        help="""
+        Resample the judges N times, and tell how often
+        each candidate lands at each rank.
+        """,
+        metavar="N"
+    )
+
+    parser.add_argument(
+        "--seed",
+        action="store",
+        default=None,
+        type=int,
+        dest="seed",
+        help="Seed of the random draws of --bootstrap."
+    )
+
+    parser.add_argument(
+        "--plot",
+        action="store",
+        dest="plot_file",
+        help="""
+        Plot the merit profiles in a PNG, PDF or SVG file.
+        SVG files are written without matplotlib.
+        """,
+        metavar="FILE"
+    )
+
+    parser.add_argument(
+        "--dpi",
+        action="store",
+        default=MERIT_PROFILE_DPI,
+        type=int,
+        dest="dpi",
+        help="Resolution of the --plot file."
+    )
+
+    parser.add_argument(
+        "--text-plot",
+        action="store_true",
+        default=False,
+        dest="text_plot",
+        help="Print the merit profiles as text, in color on a terminal."
+    )
+
+    parser.add_argument(
+        "--aggregated",
+        action="store_true",
+        default=False,
+        dest="aggregated",
+        help="""
+        The input file holds counts as `candidate,mention,count` rows,
+        instead of the judgments of each judge.
+        """
+    )
+
+    parser.add_argument(
+        "--save-tally",
+        action="store",
+        dest="save_tally",
+        help="""
+        Save the tallies in a file, to merge them
+        with the tallies of other parts of the poll.
+        """,
+        metavar="FILE"
+    )
+
+    parser.add_argument(
+        "--every",
+        action="store",
+        dest="every",
+        help="""
+        Deliberate at the end of each period, eg. 1h, from the timestamps
+        of the judges in --timestamp-col, among the skipped columns.
+        """,
+        metavar="DURATION"
+    )
+
+    parser.add_argument(
+        "--window",
+        action="store",
+        dest="window",
+        help="""
+        With --every, only count the judges of the last DURATION,
+        eg. the same as --every for separate periods.
+        All the judges so far by default.
+        """,
+        metavar="DURATION"
+    )
+
+    parser.add_argument(
+        "--timestamp-col",
+        action="store",
+        default=0,
+        type=int,
+        dest="timestamp_col",
+        help="Column of the timestamps, the first one being 0."
+    )
+
+    parser.add_argument(
+        "--timestamp-format",
+        action="store",
+        dest="timestamp_format",
+        help="Format of the timestamps, eg. %%Y-%%m-%%d %%H:%%M:%%S.",
+        metavar="FORMAT"
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        action="store",
+        dest="checkpoint",
+        help="""
+        Save the progress of the tally in FILE, every --checkpoint-every
+        seconds, to --resume it if it is interrupted.
+        """,
+        metavar="FILE"
+    )
+
+    parser.add_argument(
+        "--checkpoint-every",
+        action="store",
+        default=CHECKPOINT_INTERVAL,
+        type=float,
+        dest="checkpoint_every",
+        help="Seconds between two checkpoints.",
+        metavar="SECONDS"
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        dest="resume",
+        help="Resume the tally from the --checkpoint, if there is one."
     )
 
     # Optional verbosity counter (eg. -v, -vv, -vvv, etc.)
@@ -1,5 +1,24 @@
 import unittest
-from limaju import deliberate, plot_merit_profile, load_mentions_from_string
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from functools import cmp_to_key
+from io import StringIO
+import limaju
+from limaju import \
+    deliberate, plot_merit_profile, load_mentions_from_string, \
+    sort_candidates, sort_two_candidates, tally_judgments, \
+    get_medians_from_matrix, convert_judgments_to_store, load_judgments_store, \
+    load_judgments_from_file, Profile, bootstrap_ranks, \
+    get_matrix_from_tallies, find_polls, deliberate_polls, plot_merit_profiles, \
+    write_merit_profile_svg, write_merit_profile_text, LiveTally, \
+    start_ballots_server, rank_candidates, Validation, InvalidJudgmentsError, \
+    merge_tally_files, get_tallies_from_matrix, deliberate_over_time, \
+    parse_duration, parse_timestamp, ALGORITHMS, load_judgments_from_string
 
 
 class TestLimaju(unittest.TestCase):
@@ -69,6 +88,663 @@ EXCELLENT, EXCELLENT, EXCELLENT, EXCELLENT
 
         self.assertEqual(deliberation, ['B', 'D', 'A', 'C'])
 
+    def test_tally_matrix(self):
+        candidates, tally_matrix = tally_judgments([
+            ['A', 'B', 'C'],
+            ['POOR', 'GOOD', ''],
+            ['EXCELLENT', 'GOOD', 'EXCELLENT'],
+            ['POOR', 'PASSABLE', 'REJECT'],
+        ], self.test_mentions_array)
+
+        self.assertEqual(candidates, ['A', 'B', 'C'])
+        self.assertEqual(tally_matrix.tolist(), [
+            [1, 0, 0, 0, 0, 2, 0],
+            [0, 0, 2, 0, 1, 0, 0],
+            [1, 0, 0, 0, 0, 0, 2],
+        ])
+        self.assertEqual(get_medians_from_matrix(tally_matrix).tolist(), [
+            5, 2, 6
+        ])
+
+    def test_deliberation_streamed_from_file(self):
+        with open("examples/judgments_01.csv") as sample:
+            expected = deliberate(sample.read(), self.test_mentions)
+
+        chunk_size = limaju.TALLY_CHUNK_SIZE
+        limaju.TALLY_CHUNK_SIZE = 7  # judgments, to span many chunks
+        try:
+            with open("examples/judgments_01.csv") as sample:
+                streamed = deliberate(sample, self.test_mentions)
+        finally:
+            limaju.TALLY_CHUNK_SIZE = chunk_size
+
+        self.assertEqual(streamed, expected)
+
+    def test_liquid_deliberation_with_delegations(self):
+        deliberation, tally = deliberate(u"""
+judge, A, B
+ann, GOOD, POOR
+bob, @ann
+cid, @bob, GOOD
+dan, @eve, @dan
+eve, @dan, PASSABLE
+fox, @nobody,
+        """, self.test_mentions, liquid=True)
+
+        # Chains lead to ann, cycles and unknown judges are blanks.
+        self.assertEqual(tally['A']['GOOD'], 3)
+        self.assertEqual(tally['A']['REJECT'], 3)
+        self.assertEqual(tally['B']['GOOD'], 1)
+        self.assertEqual(tally['B']['PASSABLE'], 1)
+        self.assertEqual(tally['B']['POOR'], 2)
+        self.assertEqual(tally['B']['REJECT'], 2)
+        self.assertEqual(deliberation, ['B', 'A'])
+
+    def test_deliberation_in_parallel_jobs(self):
+        rng = random.Random(7)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) \
+                as judgments_file:
+            judgments_file.write('Comment,A,B,C\n')
+            # A quote within a field is a mere character, not an opening one.
+            judgments_file.write('it\'s 5" tall,GOOD,POOR,GOOD\n')
+            for _ in range(500):
+                # Quoted newlines in the skipped column must not split rows.
+                comment = '"one\n""two""\n"' if rng.random() < 0.3 else 'ok'
+                judgments_file.write(comment + ',' + ','.join(
+                    rng.choice(self.test_mentions_array) for _ in range(3)
+                ) + '\n')
+        try:
+            results = []
+            for jobs in (1, 3, 8):
+                with open(judgments_file.name) as judgments:
+                    results.append(deliberate(
+                        judgments, self.test_mentions, skip_cols=1, jobs=jobs
+                    ))
+        finally:
+            os.unlink(judgments_file.name)
+
+        self.assertEqual(sum(results[0][1]['A'].values()), 501)
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(results[2], results[0])
+
+    def test_deliberation_of_compressed_judgments(self):
+        import bz2
+        import gzip
+        import lzma
+        rng = random.Random(11)
+        judgments = 'A,B,C\n' + ''.join(','.join(
+            rng.choice(self.test_mentions_array) for _ in range(3)
+        ) + '\n' for _ in range(300))
+        expected = deliberate(judgments, self.test_mentions)
+
+        work_dir = tempfile.mkdtemp()
+        for module in (gzip, bz2, lzma):
+            filename = os.path.join(work_dir, 'judgments.csv.' + module.__name__)
+            with module.open(filename, 'wt') as compressed_file:
+                compressed_file.write(judgments)
+
+            # Compressed files are tallied by a single process.
+            with open(filename) as judgments_file:
+                self.assertEqual(deliberate(
+                    judgments_file, self.test_mentions, jobs=2
+                ), expected)
+            with open(filename) as judgments_file:
+                with self.assertRaises(ValueError):
+                    deliberate(
+                        judgments_file, self.test_mentions,
+                        checkpoint_filename=filename + '.checkpoint'
+                    )
+
+            with open(filename, 'rb') as compressed_file:
+                output = subprocess.check_output(
+                    [sys.executable, 'limaju.py'],
+                    stdin=compressed_file,
+                    stderr=subprocess.STDOUT,
+                    cwd=os.path.dirname(os.path.abspath(__file__))
+                ).decode('utf-8')
+            self.assertIn("Read judgments from 300 judges.", output)
+            os.unlink(filename)
+        os.rmdir(work_dir)
+
+    def test_deliberation_of_some_candidates(self):
+        judgments = (
+            'Comment,A,B,C,D\n'
+            'ok,GOOD,unknown,POOR,EXCELLENT\n'
+            'ok,REJECT,,GOOD,VERY GOOD\n'
+            'ok,GOOD,unknown,PASSABLE,POOR\n'
+        )
+        expected = deliberate(
+            judgments.replace('unknown', 'GOOD'), self.test_mentions,
+            skip_cols=1
+        )
+
+        # The unknown mentions of B are not even read.
+        deliberation, tallies = deliberate(
+            judgments, self.test_mentions, skip_cols=1, candidates=['D', 'A']
+        )
+        self.assertEqual(deliberation, ['D', 'A'])
+        self.assertEqual(tallies, dict(
+            (c, expected[1][c]) for c in ('D', 'A')
+        ))
+
+        store_file = tempfile.NamedTemporaryFile(suffix='.limaju', delete=False)
+        store_file.close()
+        try:
+            store = convert_judgments_to_store(
+                load_judgments_from_string(judgments.replace('unknown', '')),
+                store_file.name, self.test_mentions_array, skip_cols=1
+            )
+            self.assertEqual(
+                deliberate(store, None, candidates=['A', 'D']),
+                (deliberation, tallies)
+            )
+        finally:
+            os.unlink(store_file.name)
+
+        with self.assertRaises(ValueError):
+            deliberate(
+                judgments, self.test_mentions, skip_cols=1, candidates=['E']
+            )
+
+    def test_unknown_mentions_with_each_policy(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) \
+                as judgments_file:
+            judgments_file.write('Comment,A,B\n')
+            for row in range(1, 1001):
+                judgments_file.write('ok,%s,%s\n' % (
+                    'GOD' if row in (3, 900) else 'GOOD',
+                    'BAD' if row == 900 else 'POOR',
+                ))
+        try:
+            for jobs in (1, 4):
+                with open(judgments_file.name) as judgments:
+                    with self.assertRaises(InvalidJudgmentsError) as context:
+                        deliberate(
+                            judgments, self.test_mentions, skip_cols=1,
+                            jobs=jobs
+                        )
+                self.assertEqual(context.exception.errors_amount, 3)
+                self.assertEqual(
+                    [tuple(e) for e in context.exception.errors],
+                    [(3, 2, 'GOD'), (900, 2, 'GOD'), (900, 3, 'BAD')]
+                )
+
+                for policy, judges, rejected in (('blank', 1000, 2),
+                                                 ('skip', 998, 0)):
+                    validation = Validation(policy)
+                    with open(judgments_file.name) as judgments:
+                        _, tally = deliberate(
+                            judgments, self.test_mentions, skip_cols=1,
+                            jobs=jobs, validation=validation
+                        )
+                    self.assertEqual(sum(tally['A'].values()), judges)
+                    self.assertEqual(tally['A']['REJECT'], rejected)
+                    self.assertEqual(validation.errors_amount, 3)
+        finally:
+            os.unlink(judgments_file.name)
+
+    def test_deliberation_of_aggregated_tallies(self):
+        with open("examples/judgments_01.csv") as sample:
+            expected = deliberate(sample, self.test_mentions)
+        deliberation, tally = expected
+
+        counts = "candidate,mention,count\n" + "".join(
+            "%s,%s,%d\n" % (candidate, mention, count)
+            for candidate in reversed(deliberation)
+            for mention, count in tally[candidate].items()
+            if count
+        )
+        self.assertEqual(
+            deliberate(StringIO(counts), self.test_mentions, aggregated=True),
+            expected
+        )
+        self.assertEqual(deliberate(tally, self.test_mentions), expected)
+
+        # Missing judgments are blank, so the lowest mention.
+        _, padded = deliberate(
+            {'A': {'GOOD': 3}, 'B': {'POOR': 1}}, self.test_mentions
+        )
+        self.assertEqual(padded['B']['REJECT'], 2)
+
+        # Only the first row may be a header.
+        with self.assertRaisesRegex(ValueError, "Invalid count `3x' at row 2"):
+            deliberate(StringIO(
+                "candidate,mention,count\nA,GOOD,3x\nA,GOOD,3\n"
+            ), self.test_mentions, aggregated=True)
+
+    def test_merging_partial_tallies(self):
+        with open("examples/judgments_01.csv") as sample:
+            rows = list(load_judgments_from_file(sample))
+        expected = deliberate(rows, self.test_mentions)
+
+        tallies_dir = tempfile.mkdtemp()
+        try:
+            filenames = []
+            # Sites list the candidates in their own order.
+            for i, part in enumerate((rows[1:20], rows[20:])):
+                filenames.append(os.path.join(tallies_dir, "%d.json" % i))
+                header = rows[0] if i == 0 else rows[0][::-1]
+                part = [r if i == 0 else r[::-1] for r in part]
+                deliberate(
+                    [header] + part, self.test_mentions,
+                    tally_filename=filenames[-1]
+                )
+            candidates, mentions, tally_matrix = merge_tally_files(filenames)
+            tally = get_tallies_from_matrix(tally_matrix, candidates, mentions)
+            self.assertEqual(tally, expected[1])
+            self.assertEqual(
+                sort_candidates(tally, candidates, mentions), expected[0]
+            )
+
+            filenames.append(os.path.join(tallies_dir, "other.json"))
+            deliberate("A,B\nGOOD,POOR", ["GOOD", "POOR"],
+                       tally_filename=filenames[-1])
+            with self.assertRaises(ValueError):
+                merge_tally_files(filenames)
+        finally:
+            for name in os.listdir(tallies_dir):
+                os.unlink(os.path.join(tallies_dir, name))
+            os.rmdir(tallies_dir)
+
+    def test_deliberation_over_time(self):
+        mentions = limaju.load_mentions_file("examples/mentions_02")
+        with open("examples/judgments_02.csv") as sample:
+            rows = list(load_judgments_from_file(sample))
+        expected = deliberate(rows, mentions, skip_cols=1)
+
+        cumulative = list(deliberate_over_time(
+            rows, mentions, parse_duration('1d')
+        ))
+        self.assertEqual(len(cumulative), 7)  # days with new judges
+        self.assertEqual(str(cumulative[0][0]), '2019-12-09 00:00:00')
+        self.assertEqual(cumulative[-1][1:], expected)
+
+        tumbling = list(deliberate_over_time(
+            rows, mentions, parse_duration('1d'), parse_duration('1d')
+        ))
+        judges = [sum(tally[ranking[0]].values()) for _, ranking, tally
+                  in tumbling]
+        self.assertEqual(judges, [9, 3, 2, 0, 1, 0, 1, 1, 0, 1])
+
+        # Each deliberation of a sliding window, like from scratch.
+        sliding = deliberate_over_time(
+            rows, mentions, parse_duration('12h'), parse_duration('2d')
+        )
+        for end, ranking, tally in sliding:
+            window = [
+                row for row in rows[1:]
+                if end - parse_duration('2d')
+                <= parse_timestamp(row[0]) < end
+            ]
+            if window:
+                self.assertEqual(
+                    (ranking, tally),
+                    deliberate([rows[0]] + window, mentions, skip_cols=1)
+                )
+
+    def test_tally_resumed_from_a_checkpoint(self):
+        rng = random.Random(11)
+        lines = ['A,B,C\n'] + [
+            ','.join(
+                rng.choice(self.test_mentions_array + ['', 'TYPO'])
+                for _ in range(3)
+            ) + '\n'
+            for _ in range(300)
+        ]
+        work_dir = tempfile.mkdtemp()
+        judgments_filename = os.path.join(work_dir, 'judgments.csv')
+        checkpoint_filename = os.path.join(work_dir, 'checkpoint.json')
+        try:
+            with open(judgments_filename, 'w') as judgments_file:
+                judgments_file.writelines(lines)
+            expected_validation = Validation('blank')
+            with open(judgments_filename) as judgments:
+                expected = deliberate(
+                    judgments, self.test_mentions,
+                    validation=expected_validation
+                )
+
+            # Interrupted after 120 judges, as far as the checkpoint knows.
+            with open(judgments_filename, 'w') as judgments_file:
+                judgments_file.writelines(lines[:121])
+            with open(judgments_filename) as judgments:
+                deliberate(
+                    judgments, self.test_mentions,
+                    validation=Validation('blank'),
+                    checkpoint_filename=checkpoint_filename,
+                    checkpoint_interval=0
+                )
+            with open(judgments_filename, 'w') as judgments_file:
+                judgments_file.writelines(lines)
+
+            validation = Validation('blank')
+            with open(judgments_filename) as judgments:
+                self.assertEqual(
+                    deliberate(
+                        judgments, self.test_mentions,
+                        validation=validation,
+                        checkpoint_filename=checkpoint_filename,
+                        resume=True
+                    ),
+                    expected
+                )
+            self.assertEqual(validation.errors, expected_validation.errors)
+            self.assertEqual(validation.rows, 300)
+
+            # Not the same judgments anymore.
+            with open(judgments_filename, 'w') as judgments_file:
+                judgments_file.writelines(lines[:50] + lines[51:])
+            with self.assertRaises(ValueError):
+                with open(judgments_filename) as judgments:
+                    deliberate(
+                        judgments, self.test_mentions,
+                        validation=Validation('blank'),
+                        checkpoint_filename=checkpoint_filename,
+                        resume=True
+                    )
+        finally:
+            for name in os.listdir(work_dir):
+                os.unlink(os.path.join(work_dir, name))
+            os.rmdir(work_dir)
+
+    def test_import_does_not_load_the_plotting_stack(self):
+        loaded = subprocess.check_output([
+            sys.executable, '-c',
+            "import sys, limaju; "
+            "print(' '.join(m for m in ('matplotlib', 'numpy') "
+            "if m in sys.modules))"
+        ], cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        self.assertEqual(loaded.strip(), b'')
+
+    def test_deliberation_of_a_binary_store(self):
+        mentions = limaju.load_mentions_file("examples/mentions_02")
+        with open("examples/judgments_02.csv") as sample:
+            expected = deliberate(sample, mentions, skip_cols=1)
+
+        store_file = tempfile.NamedTemporaryFile(suffix='.limaju', delete=False)
+        store_file.close()
+        try:
+            with open("examples/judgments_02.csv") as sample:
+                convert_judgments_to_store(
+                    load_judgments_from_file(sample),
+                    store_file.name, mentions, skip_cols=1
+                )
+            store = load_judgments_store(store_file.name)
+            self.assertEqual(store.judges, 18)
+            self.assertEqual(deliberate(store, None), expected)
+        finally:
+            os.unlink(store_file.name)
+
+    def test_batch_deliberation_isolates_failures(self):
+        polls_dir = tempfile.mkdtemp()
+        try:
+            with open("examples/judgments_01.csv") as sample:
+                judgments = sample.read()
+            for name in ('a.csv', 'c.csv'):
+                with open(os.path.join(polls_dir, name), 'w') as poll:
+                    poll.write(judgments)
+            with open(os.path.join(polls_dir, 'b.csv'), 'w') as poll:
+                poll.write("X,Y\nGOOD,NOPE\n")
+
+            polls = find_polls([polls_dir])
+            self.assertEqual(
+                [os.path.basename(p) for p in polls],
+                ['a.csv', 'b.csv', 'c.csv']
+            )
+            with open("examples/judgments_01.csv") as sample:
+                expected, _ = deliberate(sample, self.test_mentions)
+
+            for jobs in (1, 2):
+                with redirect_stdout(StringIO()):
+                    results = list(deliberate_polls(
+                        polls, self.test_mentions_array, jobs=jobs
+                    ))
+                self.assertEqual(results[0]['ranking'], expected)
+                self.assertEqual(results[0]['medians'][expected[0]], 'GOOD')
+                self.assertIn('error', results[1])
+                self.assertEqual(results[2]['ranking'], expected)
+                json.dumps(results)
+        finally:
+            for name in os.listdir(polls_dir):
+                os.unlink(os.path.join(polls_dir, name))
+            os.rmdir(polls_dir)
+
+    def test_deliberation_with_a_tally_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            results = []
+            for _ in range(2):
+                with open("examples/judgments_01.csv") as sample:
+                    results.append(deliberate(
+                        sample, self.test_mentions, cache_dir=cache_dir
+                    ))
+            self.assertEqual(results[1], results[0])
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            # Another tally, with room for one only: the oldest goes.
+            oldest = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+            os.utime(oldest, (0, 0))
+            with open("examples/judgments_01.csv") as sample:
+                deliberate(
+                    sample, self.test_mentions, skip_cols=1,
+                    cache_dir=cache_dir,
+                    cache_size=os.path.getsize(oldest) + 16
+                )
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertFalse(os.path.exists(oldest))
+        finally:
+            for name in os.listdir(cache_dir):
+                os.unlink(os.path.join(cache_dir, name))
+            os.rmdir(cache_dir)
+
+    def test_deliberation_with_a_profile(self):
+        with open("examples/mentions_02") as mentions_file:
+            mentions = mentions_file.read()
+
+        profile = Profile()
+        try:
+            with open("examples/judgments_02.csv") as sample:
+                deliberate(sample, mentions, skip_cols=1, profile=profile)
+        finally:
+            profile.close()
+
+        report = json.loads(profile.format('json'))
+        self.assertEqual(
+            [phase['name'] for phase in report['phases']],
+            ['parse', 'validate', 'count', 'tally', 'sort']
+        )
+        self.assertEqual(report['counters'], {
+            'rows': 18, 'blanks': 1, 'majority_values': 9,
+        })
+        for phase in report['phases']:
+            self.assertGreaterEqual(phase['wall'], 0)
+            self.assertGreater(phase['peak_memory'], 0)
+
+    def test_top_k_deliberation(self):
+        with open("examples/judgments_01.csv") as sample:
+            judgments = sample.read()
+        deliberation, tally = deliberate(judgments, self.test_mentions)
+
+        for top_k in range(1, len(deliberation) + 2):
+            top, tally = deliberate(judgments, self.test_mentions, top_k=top_k)
+            self.assertEqual(top, deliberation[:top_k])
+
+    def test_bootstrap_of_the_ranking(self):
+        with open("examples/judgments_01.csv") as sample:
+            deliberation, tally = deliberate(sample, self.test_mentions)
+        tally_matrix = get_matrix_from_tallies(
+            tally, deliberation, self.test_mentions_array
+        )
+
+        rank_counts = bootstrap_ranks(tally_matrix, 500, seed=1)
+
+        self.assertEqual(rank_counts.shape, (6, 6))
+        self.assertEqual(rank_counts.sum(axis=0).tolist(), [500] * 6)
+        self.assertEqual(rank_counts.sum(axis=1).tolist(), [500] * 6)
+        self.assertTrue(
+            (rank_counts == bootstrap_ranks(tally_matrix, 500, seed=1)).all()
+        )
+        # Sure winner, with a GOOD median where others are SOMEWHAT GOOD
+        self.assertGreater(rank_counts[0][0], 250)
+
+    def test_live_tally_served_ballot_by_ballot(self):
+        import asyncio
+        with open("examples/judgments_01.csv") as sample:
+            judgments = list(load_judgments_from_file(sample))
+        with open("examples/judgments_01.csv") as sample:
+            expected, tally = deliberate(sample, self.test_mentions)
+
+        live_tally = LiveTally(judgments[0], self.test_mentions_array)
+        for ballot in judgments[1:]:
+            live_tally.add_ballot(ballot)
+            self.assertEqual(
+                live_tally.get_ranking(),
+                sort_candidates(
+                    live_tally.get_tallies(), judgments[0],
+                    self.test_mentions_array
+                )
+            )
+        self.assertEqual(live_tally.get_ranking(), expected)
+        self.assertEqual(live_tally.get_tallies(), tally)
+        with self.assertRaises(ValueError):
+            live_tally.add_ballot(['NOPE'])
+        self.assertEqual(live_tally.judges, 43)
+
+        async def talk(lines):
+            server = await start_ballots_server(live_tally)
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            answers = []
+            for line in lines:
+                writer.write((line + "\n").encode('utf-8'))
+                answers.append(json.loads(await reader.readline()))
+            writer.write_eof()
+            await reader.read()  # until the server is done with us
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return answers
+
+        loop = asyncio.new_event_loop()
+        try:
+            answers = loop.run_until_complete(talk([
+                '?ranking 1',
+                '{"Candidate A": "EXCELLENT"}',
+                'GOOD,NOPE',
+                '?medians',
+            ]))
+        finally:
+            loop.close()
+        self.assertEqual(answers[0], {'ranking': ['Candidate B'], 'judges': 43})
+        self.assertEqual(answers[1], {'judges': 44})
+        self.assertIn('error', answers[2])
+        self.assertEqual(answers[3]['medians']['Candidate B'], 'GOOD')
+
+    def test_ranking_with_tied_groups(self):
+        mentions = self.test_mentions_array
+        tallies = {
+            'A': {m: 0 for m in mentions},
+            'B': {m: 0 for m in mentions},
+            'C': {m: 0 for m in mentions},
+            'D': {m: 0 for m in mentions},
+        }
+        for candidate, counts in zip('ABCD', ((2, 1), (1, 2), (2, 1), (1, 2))):
+            tallies[candidate]['GOOD'], tallies[candidate]['POOR'] = counts
+
+        self.assertEqual(
+            rank_candidates(tallies, ['D', 'C', 'B', 'A'], mentions),
+            [['C', 'A'], ['D', 'B']]
+        )
+        self.assertEqual(
+            rank_candidates(tallies, ['A', 'B', 'C', 'D'], mentions, top_k=1),
+            [['A']]
+        )
+
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(
+                sort_two_candidates(tallies, mentions, 'A', 'C'), 0
+            )
+        self.assertEqual(output.getvalue(), '')
+
+    def test_ranking_with_each_algorithm(self):
+        mentions = self.test_mentions_array
+        tallies = {
+            'A': {m: 0 for m in mentions},
+            'B': {m: 0 for m in mentions},
+        }
+        # Both have a GOOD median, A with more judgments above it than B,
+        # but also more judgments below it.
+        tallies['A'].update({'EXCELLENT': 4, 'GOOD': 2, 'REJECT': 5})
+        tallies['B'].update({'GOOD': 7, 'SOMEWHAT GOOD': 4})
+
+        rankings = dict(
+            (algorithm, sort_candidates(
+                tallies, ['A', 'B'], mentions, algorithm=algorithm
+            ))
+            for algorithm in ALGORITHMS
+        )
+        self.assertEqual(rankings, {
+            'majority-judgment': ['B', 'A'],
+            'typical-judgment': ['A', 'B'],
+            'usual-judgment': ['A', 'B'],
+            'central-judgment': ['A', 'B'],
+            'majority-gauge': ['B', 'A'],
+        })
+
+        for algorithm in ALGORITHMS:
+            self.assertEqual(
+                sort_candidates({}, [], mentions, algorithm=algorithm), []
+            )
+
+        # Without judgments, after any candidate with judgments, even all
+        # rejected ones, and not in exact equality with them.
+        tallies['C'] = {m: 0 for m in mentions}
+        tallies['D'] = {m: 0 for m in mentions}
+        tallies['D']['REJECT'] = 11
+        for algorithm in ALGORITHMS:
+            self.assertEqual(rank_candidates(
+                tallies, ['C', 'D', 'A', 'B'], mentions, algorithm=algorithm
+            )[-2:], [['D'], ['C']])
+
+        with self.assertRaises(ValueError):
+            sort_candidates(tallies, ['A', 'B'], mentions, algorithm='borda')
+
+    def test_sorting_like_the_pairwise_comparator(self):
+        mentions = self.test_mentions_array
+        candidates = ['A', 'B', 'C', 'D', 'E', 'F']
+        rng = random.Random(42)
+        for attempt in range(600):
+            judges = rng.randint(1, 15)
+            tallies = dict()
+            for candidate in candidates:
+                tallies[candidate] = dict((m, 0) for m in mentions)
+                if candidate == 'F':  # no judgments at all
+                    continue
+                if attempt % 2:  # as many judges for all the candidates
+                    amount = judges
+                else:
+                    amount = rng.randint(1, 15)
+                for _ in range(amount):
+                    # Few mentions in use, to get plenty of equal medians
+                    tallies[candidate][mentions[rng.randint(1, 3)]] += 1
+
+            def _cmp_candidates(ca, cb):
+                return sort_two_candidates(tallies, mentions, ca, cb)
+
+            ranking = sort_candidates(tallies, candidates, mentions)
+            if attempt % 2:
+                self.assertEqual(
+                    ranking,
+                    sorted(candidates, key=cmp_to_key(_cmp_candidates))
+                )
+            # The comparator finds an exact equality when the judgments of
+            # one candidate run out first, and only then may both orders go.
+            for i, ca in enumerate(ranking):
+                for cb in ranking[i + 1:]:
+                    self.assertLessEqual(_cmp_candidates(ca, cb), 0)
+
     def test_plotting_deliberation_with_merit_profiles(self):
         mentions = load_mentions_from_string(self.test_mentions)
         judgments = ''
@@ -97,6 +773,70 @@ EXCELLENT, EXCELLENT, EXCELLENT, EXCELLENT
         filename = "merit_profiles_02.png"
         plot_merit_profile(tally, deliberation, mentions, filename=filename)
 
+    def test_plotting_many_merit_profiles_in_parallel(self):
+        with open("examples/judgments_01.csv") as sample:
+            deliberation, tally = deliberate(sample, self.test_mentions)
+
+        plots_dir = tempfile.mkdtemp()
+        try:
+            filenames = [
+                os.path.join(plots_dir, "plot_%d.png" % i) for i in range(4)
+            ]
+            plot_merit_profiles(
+                [(f, tally, deliberation, self.test_mentions_array)
+                 for f in filenames],
+                dpi=50, jobs=2
+            )
+            for filename in filenames:
+                with open(filename, 'rb') as plot:
+                    self.assertEqual(plot.read(8), b'\x89PNG\r\n\x1a\n')
+        finally:
+            for name in os.listdir(plots_dir):
+                os.unlink(os.path.join(plots_dir, name))
+            os.rmdir(plots_dir)
+
+    def test_merit_profiles_without_matplotlib(self):
+        import xml.etree.ElementTree as ElementTree
+        with open("examples/judgments_01.csv") as sample:
+            deliberation, tally = deliberate(sample, self.test_mentions)
+
+        svg = StringIO()
+        write_merit_profile_svg(
+            tally, deliberation, self.test_mentions_array, svg
+        )
+        root = ElementTree.fromstring(svg.getvalue())
+        texts = [e.text for e in root.iter('{http://www.w3.org/2000/svg}text')]
+        self.assertIn('Merit Profiles', texts)
+        self.assertIn('Candidate B', texts)
+        self.assertIn('43', texts)  # judges
+
+        text = StringIO()
+        write_merit_profile_text(
+            tally, deliberation, self.test_mentions_array, text, width=40
+        )
+        lines = text.getvalue().splitlines()
+        self.assertEqual(len(lines), 7)  # and the legend
+        self.assertTrue(lines[0].startswith('Candidate B #'))
+        self.assertEqual(len(lines[0]), len('Candidate B ') + 40)
+
+        plots_dir = tempfile.mkdtemp()
+        plot_file = os.path.join(plots_dir, 'plot.svg')
+        try:
+            loaded = subprocess.check_output([
+                sys.executable, '-c',
+                "import os, sys, limaju; "
+                "t = {'A': {'GOOD': 1}, 'B': {'GOOD': 2}}; "
+                "f = sys.argv[1]; "
+                "limaju.plot_merit_profile(t, ['B', 'A'], ['GOOD'], f); "
+                "print('matplotlib' in sys.modules, os.path.getsize(f) > 0)",
+                plot_file
+            ], cwd=os.path.dirname(os.path.abspath(__file__)))
+        finally:
+            if os.path.exists(plot_file):
+                os.unlink(plot_file)
+            os.rmdir(plots_dir)
+        self.assertEqual(loaded.split(), [b'False', b'True'])
+
     # def test_raise(self):
     #     with self.assertRaises(TypeError):
     #         s.split(2)